@@ -0,0 +1,154 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RAW_HEADER = struct.Struct("<II")  # width, height of the RGBA pixels that follow
+
+
+class AssetManager:
+    """
+    Loads images relative to the package instead of the working directory.
+
+    Decoded, display-converted surfaces are cached per file and
+    modification time in a dictionary shared by every instance, so several
+    views share one copy of the pixels. Files are decoded in parallel, can
+    be kept as raw pixels in an on-disk cache to skip PNG decoding on the
+    next start, and sprites can be packed into a single shared atlas.
+    """
+
+    surfaces = {}  # (path, mtime) -> converted surface, shared by all instances
+    atlases = {}  # ((path, mtime) of the members, padding) -> packed subsurfaces
+
+    def __init__(self, base_dir=ASSET_DIR, cache_dir=None, workers=4):
+        """
+        Initialize the manager.
+
+        Args:
+            base_dir: Directory the image names are relative to
+            cache_dir: Directory of the raw-pixel cache, or None to disable it
+            workers: Number of threads decoding images
+        """
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir
+        self.workers = workers
+
+    def path(self, name):
+        """Return the absolute path of an asset."""
+        return os.path.join(self.base_dir, name)
+
+    def _cache_path(self, name, mtime):
+        return os.path.join(self.cache_dir, f"{name}.{mtime}.raw")
+
+    def _decode(self, name, mtime):
+        """Decode an image, from the raw-pixel cache when possible."""
+        if self.cache_dir is not None:
+            try:
+                with open(self._cache_path(name, mtime), "rb") as f:
+                    data = f.read()
+                size = RAW_HEADER.unpack_from(data)
+                return pygame.image.frombytes(data[RAW_HEADER.size:], size, "RGBA")
+            except (OSError, struct.error, ValueError):
+                pass
+
+        surface = pygame.image.load(self.path(name))
+        if self.cache_dir is not None:
+            self._store_raw(name, mtime, surface)
+        return surface
+
+    def _store_raw(self, name, mtime, surface):
+        """Write the decoded pixels to the raw-pixel cache."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(name, mtime), "wb") as f:
+                f.write(RAW_HEADER.pack(*surface.get_size()))
+                f.write(pygame.image.tobytes(surface, "RGBA"))
+        except OSError:
+            pass  # The cache is only an optimization
+
+    def load_images(self, names):
+        """
+        Load several images, decoding the uncached ones in parallel.
+
+        Args:
+            names: File names relative to base_dir
+
+        Returns:
+            dict: Surfaces keyed by name, converted for fast blitting when
+                a display mode is set
+
+        Raises:
+            pygame.error, OSError: If an image cannot be loaded
+        """
+        keys = {name: (self.path(name), os.stat(self.path(name)).st_mtime_ns)
+                for name in names}
+        missing = [name for name in names if keys[name] not in self.surfaces]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                decoded = list(executor.map(
+                    lambda name: self._decode(name, keys[name][1]), missing))
+
+            # Conversion needs the display, so it happens on this thread
+            convert = pygame.display.get_surface() is not None
+            for name, surface in zip(missing, decoded):
+                self.surfaces[keys[name]] = surface.convert_alpha() if convert else surface
+
+        return {name: self.surfaces[keys[name]] for name in names}
+
+    def load_atlas(self, names, padding=1):
+        """
+        Load several images packed into a single atlas.
+
+        The sheet is cached like the images, keyed by the (path, mtime) of
+        its members, and the cached images are replaced by subsurfaces of
+        it, so every manager shares one sheet and no unpacked copy stays
+        behind.
+
+        Args:
+            names: File names relative to base_dir
+            padding: Empty pixels between packed images
+
+        Returns:
+            dict: Subsurfaces of the atlas keyed by name
+
+        Raises:
+            pygame.error, OSError: If an image cannot be loaded
+        """
+        keys = [(self.path(name), os.stat(self.path(name)).st_mtime_ns) for name in names]
+        atlas_key = (tuple(keys), padding)
+        packed = self.atlases.get(atlas_key)
+        if packed is not None:
+            return dict(zip(names, packed))
+
+        images = self.load_images(names)
+        order = sorted(names, key=lambda name: -images[name].get_height())
+
+        # Shelf packing, tallest images first
+        area = sum((images[name].get_width() + padding) * (images[name].get_height() + padding)
+                   for name in names)
+        width = max(max(image.get_width() for image in images.values()), int(area ** 0.5) + 1)
+        positions = {}
+        x = y = shelf = 0
+        for name in order:
+            w, h = images[name].get_size()
+            if x + w > width:
+                x, y, shelf = 0, y + shelf + padding, 0
+            positions[name] = (x, y)
+            x += w + padding
+            shelf = max(shelf, h)
+
+        sheet = pygame.Surface((width, y + shelf), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha()
+        sheet.fill((0, 0, 0, 0))
+
+        packed = []
+        for name, key in zip(names, keys):
+            surface = sheet.subsurface(sheet.blit(images[name], positions[name]))
+            self.surfaces[key] = surface
+            packed.append(surface)
+        self.atlases[atlas_key] = packed
+        return dict(zip(names, packed))
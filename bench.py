@@ -0,0 +1,219 @@
+"""
+Benchmark runner for the game.
+
+Runs scripted stress scenarios against Controller, State and View with
+the SDL dummy video driver and a virtual clock, then reports simulation
+ticks/sec (fixed steps, several per frame), render ms/frame and peak
+memory as JSON. Results can be saved as a baseline and later runs
+compared against it to catch regressions:
+
+    python bench.py --output results.json --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from clock import VirtualClock
+from constants import *
+
+# Metrics where a higher value is better; every other metric is better lower
+HIGHER_IS_BETTER = {"ticks_per_sec"}
+
+
+def make_controller():
+    """Create a Controller on a virtual clock without frame rate cap."""
+    from controller import Controller
+    return Controller(clock=VirtualClock(), fps=0)
+
+
+def idle(controller, frame):
+    """Nothing but the plane, clouds, ground and instruments."""
+
+
+def bombs(count):
+    """Keep about count bombs in the air by dropping a share every frame."""
+    per_frame = max(1, count // 50)
+
+    def scenario(controller, frame):
+        controller.state.plane_altitude = 50
+        for _ in range(per_frame):
+            controller.add_bomb()
+
+    scenario.__doc__ = f"About {count} simultaneous bombs via add_bomb."
+    return scenario
+
+
+def explosions(controller, frame):
+    """Continuous explosions via State.add_explosion."""
+    current_time = controller.simulation.clock.get_ticks()
+    for i in range(20):
+        controller.state.add_explosion((i * 40, controller.view.dimensions[1] - 20),
+                                       current_time)
+
+
+def mouse_flood(controller, frame):
+    """A thousand MOUSEMOTION events per frame into handle_event."""
+    for i in range(1000):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(400, 100 + i % 400),
+                                             rel=(0, 1), buttons=(0, 0, 0)))
+
+
+SCENARIOS = {
+    "idle": idle,
+    "bombs_1k": bombs(1000),
+    "bombs_10k": bombs(10000),
+    "explosions": explosions,
+    "mouse_flood": mouse_flood,
+}
+
+
+def run_scenario(scenario, frames):
+    """
+    Run a scenario and time the update and render phases.
+
+    Args:
+        scenario: Callable run before every frame with (controller, frame)
+        frames: Number of frames to run
+
+    Returns:
+        dict: Measured metrics
+    """
+    controller = make_controller()
+    clock = controller.clock
+    update_ns = 0
+    render_ns = 0
+    live_bombs = 0
+    ticks = 0
+
+    def count_tick(simulation):
+        # A frame runs as many fixed simulation steps as its time needs
+        nonlocal ticks
+        ticks += 1
+
+    controller.simulation.add_observer(count_tick)
+
+    for frame in range(frames):
+        scenario(controller, frame)
+        clock.advance(1000.0 / FPS)
+
+        start = time.perf_counter_ns()
+        controller.handle_event()
+        controller.update_game()
+        middle = time.perf_counter_ns()
+        controller.render_game()
+        end = time.perf_counter_ns()
+
+        update_ns += middle - start
+        render_ns += end - middle
+        live_bombs += len(controller.state.bombs)
+
+    return {
+        "ticks_per_sec": ticks / (update_ns / 1e9) if update_ns else float("inf"),
+        "render_ms_per_frame": render_ns / 1e6 / frames,
+        "mean_live_bombs": live_bombs / frames,
+    }
+
+
+def measure_peak_memory(scenario, frames):
+    """Return the peak traced memory in KiB while running a scenario."""
+    tracemalloc.start()
+    try:
+        run_scenario(scenario, frames)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run(names, frames):
+    """
+    Run the selected scenarios.
+
+    Args:
+        names: Scenario names
+        frames: Number of frames per scenario
+
+    Returns:
+        dict: Metrics keyed by scenario name
+    """
+    results = {}
+    for name in names:
+        metrics = run_scenario(SCENARIOS[name], frames)
+        metrics["peak_memory_kb"] = measure_peak_memory(SCENARIOS[name], frames)
+        results[name] = metrics
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Metrics of this run
+        baseline: Metrics of the baseline run
+        tolerance: Allowed relative slowdown, e.g. 0.1 for 10%
+
+    Returns:
+        list: Human readable descriptions of the regressions
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(name, {}).get(metric)
+            if not reference or metric == "mean_live_bombs":
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (reference - value) / reference
+            else:
+                change = (value - reference) / reference
+            if change > tolerance:
+                regressions.append(f"{name}.{metric}: {reference:.3f} -> {value:.3f} "
+                                   f"({change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    """Entry point of the benchmark runner."""
+    parser = argparse.ArgumentParser(description="Run the game benchmarks.")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--frames", type=int, default=200, help="frames per scenario")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--save-baseline", help="store the results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed relative regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+
+    results = run(args.scenarios, args.frames)
+    report = json.dumps(results, indent=2)
+    print(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
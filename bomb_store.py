@@ -0,0 +1,219 @@
+import numpy as np
+
+
+class BombStore:
+    """
+    Struct-of-arrays storage for bombs.
+
+    Every bomb lives in a slot of contiguous NumPy arrays so trajectories
+    and ground hits of all bombs are computed in single vectorized passes.
+    Freed slots are recycled from a free list before the arrays grow, and
+    the passes write into preallocated scratch space, so a
+    steady stream of bombs allocates nothing per bomb.
+    """
+
+    def __init__(self, capacity=256):
+        """
+        Initialize an empty store.
+
+        Args:
+            capacity: Number of slots preallocated before the first growth
+        """
+        self.x = np.zeros(capacity)
+        self.y0 = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.depart = np.zeros(capacity)
+        self.acceleration = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.generation = np.zeros(capacity, dtype=np.int64)  # Bumped on slot reuse
+        self.mask = np.zeros(capacity, dtype=bool)  # Scratch space for the passes
+
+        self.size = 0  # High-water mark of used slots
+        self.count = 0  # Number of live bombs
+        self.free = []  # Released slots below the high-water mark
+
+    def __len__(self):
+        return self.count
+
+    def capacity(self):
+        """Return the number of allocated slots."""
+        return len(self.alive)
+
+    def _grow(self):
+        """
+        Double the capacity of every array.
+
+        Generations are kept for every slot, not only those below size:
+        pending expiry events may still refer to slots above the
+        high-water mark, and a reused slot must never repeat one.
+        """
+        new_capacity = max(1, 2 * self.capacity())
+        for name in ("x", "y0", "y", "depart", "acceleration", "alive", "generation", "mask"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, x, y0, depart, acceleration):
+        """
+        Add a bomb.
+
+        Args:
+            x: Horizontal position
+            y0: Release altitude
+            depart: Release time in milliseconds
+            acceleration: Constant vertical acceleration
+
+        Returns:
+            int: Slot holding the bomb
+        """
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity():
+                self._grow()
+            slot = self.size
+            self.size += 1
+
+        self.x[slot] = x
+        self.y0[slot] = y0
+        self.y[slot] = y0
+        self.depart[slot] = depart
+        self.acceleration[slot] = acceleration
+        self.alive[slot] = True
+        self.generation[slot] += 1
+        self.count += 1
+        return slot
+
+    def add_many(self, x, y0, depart, acceleration):
+        """
+        Add several bombs at once.
+
+        Args:
+            x: Array of horizontal positions
+            y0: Array of release altitudes
+            depart: Release time(s) in milliseconds
+            acceleration: Constant vertical acceleration(s)
+
+        Returns:
+            numpy.ndarray: Slots holding the bombs
+        """
+        n = len(x)
+        slots = np.empty(n, dtype=np.intp)
+        reused = min(n, len(self.free))
+        if reused:
+            slots[:reused] = self.free[-reused:]
+            del self.free[-reused:]
+        while self.size + n - reused > self.capacity():
+            self._grow()
+        slots[reused:] = np.arange(self.size, self.size + n - reused)
+        self.size += n - reused
+
+        self.x[slots] = x
+        self.y0[slots] = y0
+        self.y[slots] = y0
+        self.depart[slots] = depart
+        self.acceleration[slots] = acceleration
+        self.alive[slots] = True
+        self.generation[slots] += 1
+        self.count += n
+        return slots
+
+    def remove(self, slot):
+        """
+        Release a single slot.
+
+        Args:
+            slot: Slot of the bomb to remove
+        """
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.count -= 1
+            self.free.append(slot)
+
+    def release(self, slots):
+        """
+        Release several slots at once.
+
+        Args:
+            slots: Array of distinct slots; those of dead bombs are skipped
+        """
+        slots = slots[self.alive[slots]]
+        if len(slots):
+            self.alive[slots] = False
+            self.count -= len(slots)
+            self.free.extend(slots.tolist())
+        if self.count == 0:
+            self.size = 0
+            self.free.clear()
+
+    def _release(self, mask):
+        """Release every live slot selected by a boolean mask over [0, size)."""
+        if mask.any():
+            slots = np.flatnonzero(mask)
+            self.alive[slots] = False
+            self.count -= len(slots)
+            self.free.extend(slots.tolist())
+        if self.count == 0:
+            self.size = 0
+            self.free.clear()
+
+    def update(self, physics, current_time, ground_level):
+        """
+        Move every bomb and remove those reaching the ground.
+
+        Args:
+            physics: Physics instance providing mrua_1d_batch
+            current_time: Current time in milliseconds
+            ground_level: Vertical position of the ground
+
+        Returns:
+            numpy.ndarray: Horizontal positions of the bombs that hit the ground
+        """
+        n = self.size
+        y = physics.mrua_1d_batch(self.y0[:n], self.depart[:n],
+                                  self.acceleration[:n], current_time,
+                                  out=self.y[:n])
+        hit = np.greater_equal(y, ground_level, out=self.mask[:n])
+        np.logical_and(hit, self.alive[:n], out=hit)
+        hit_x = self.x[:n][hit] if hit.any() else self.x[:0]
+        self._release(hit)
+        return hit_x
+
+    def live(self):
+        """
+        Return the slots and positions of the live bombs.
+
+        Returns:
+            tuple: (slots, x, y) arrays of the live bombs
+        """
+        slots = np.flatnonzero(self.alive[:self.size])
+        return slots, self.x[slots], self.y[slots]
+
+    def positions(self):
+        """
+        Return the positions of the live bombs.
+
+        Returns:
+            tuple: (x, y) arrays of the live bombs
+        """
+        alive = self.alive[:self.size]
+        return self.x[:self.size][alive], self.y[:self.size][alive]
+
+    def positions_at(self, physics, current_time):
+        """
+        Return the positions of the live bombs at any time of their flight,
+        e.g. between two simulation steps for rendering.
+
+        Args:
+            physics: Physics instance providing mrua_1d_batch
+            current_time: Time in milliseconds
+
+        Returns:
+            tuple: (x, y) arrays of the live bombs
+        """
+        alive = self.alive[:self.size]
+        depart = np.minimum(self.depart[:self.size][alive], current_time)
+        y = physics.mrua_1d_batch(self.y0[:self.size][alive], depart,
+                                  self.acceleration[:self.size][alive], current_time)
+        return self.x[:self.size][alive], y
@@ -0,0 +1,33 @@
+class VirtualClock:
+    """Clock driven by the caller instead of wall time, for headless runs."""
+
+    def __init__(self, start=0):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Initial time in milliseconds
+        """
+        self.time = start
+
+    def get_ticks(self):
+        """Return the current virtual time in milliseconds."""
+        return self.time
+
+    def advance(self, dt):
+        """
+        Move the clock forward.
+
+        Args:
+            dt: Time step in milliseconds
+        """
+        self.time += dt
+
+
+class PygameClock:
+    """Wall clock backed by pygame.time.get_ticks()."""
+
+    def __init__(self):
+        """Bind to pygame lazily so headless code never imports it."""
+        import pygame
+        self.get_ticks = pygame.time.get_ticks
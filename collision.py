@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class TargetField:
+    """
+    Targets scrolling with the background, such as the flag.
+
+    Every target moves left at the same speed and wraps around with the
+    same period, so ordering the targets by their position at time 0 gives
+    their order at any time up to a rotation. The sorted index is only
+    rebuilt when targets are added or removed; each tick then resolves
+    all bomb-vs-target candidates with binary searches, so the cost is
+    O((bombs + targets) log targets) instead of bombs x targets.
+    """
+
+    def __init__(self, period, speed):
+        """
+        Initialize an empty field.
+
+        Args:
+            period: Horizontal wrapping period in pixels
+            speed: Scrolling speed in pixels per millisecond
+        """
+        self.period = period
+        self.speed = speed
+        self.x0 = np.zeros(0)
+        self.width = np.zeros(0)
+        self.top = np.zeros(0)
+        self.bottom = np.zeros(0)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self._index = None
+
+    def __len__(self):
+        return len(self.x0)
+
+    def add(self, x0, width, top, bottom):
+        """
+        Add a target.
+
+        Args:
+            x0: Horizontal position of the left edge at time 0
+            width: Width of the hitbox in pixels
+            top: Vertical position of the top of the hitbox
+            bottom: Vertical position of the bottom of the hitbox
+
+        Returns:
+            int: Index of the target
+        """
+        self.x0 = np.append(self.x0, x0 % self.period)
+        self.width = np.append(self.width, width)
+        self.top = np.append(self.top, top)
+        self.bottom = np.append(self.bottom, bottom)
+        self.hits = np.append(self.hits, 0)
+        self._index = None
+        return len(self.x0) - 1
+
+    def remove(self, target):
+        """
+        Remove a target; the indices of later targets shift down by one.
+
+        Args:
+            target: Index of the target
+        """
+        for name in ("x0", "width", "top", "bottom", "hits"):
+            setattr(self, name, np.delete(getattr(self, name), target))
+        self._index = None
+
+    def _build_index(self):
+        """Sort the targets by x0 and duplicate them one period to the left."""
+        order = np.argsort(self.x0, kind="stable")
+        sorted_x0 = self.x0[order]
+        self._index = (np.concatenate([sorted_x0 - self.period, sorted_x0]),
+                       np.concatenate([order, order]),
+                       float(self.width.max()))
+
+    def positions(self, current_time):
+        """
+        Return the left edge of every target on screen.
+
+        Args:
+            current_time: Current time in milliseconds
+        """
+        return (self.x0 - current_time * self.speed) % self.period
+
+    def collide(self, x, y, current_time):
+        """
+        Find the points lying inside a target hitbox.
+
+        Args:
+            x: Horizontal positions of the points
+            y: Vertical positions of the points
+            current_time: Current time in milliseconds
+
+        Returns:
+            tuple: (point indices, target indices) of each collision,
+                at most one target per point
+        """
+        empty = np.zeros(0, dtype=np.intp)
+        if len(self.x0) == 0 or len(x) == 0:
+            return empty, empty
+        if self._index is None:
+            self._build_index()
+        keys, ids, max_width = self._index
+
+        # Position of each point in the frame of the targets at time 0
+        shift = current_time * self.speed
+        query = (np.asarray(x) + shift) % self.period
+        y = np.asarray(y)
+
+        left = np.searchsorted(keys, query - max_width, side="left")
+        right = np.searchsorted(keys, query, side="right")
+
+        points = []
+        targets = []
+        hit = np.zeros(len(query), dtype=bool)
+        for offset in range(int((right - left).max(initial=0))):
+            candidate = np.flatnonzero(~hit & (left + offset < right))
+            if len(candidate) == 0:
+                break
+            target = ids[left[candidate] + offset]
+            inside = ((query[candidate] - keys[left[candidate] + offset] <= self.width[target])
+                      & (y[candidate] >= self.top[target])
+                      & (y[candidate] <= self.bottom[target]))
+            points.append(candidate[inside])
+            targets.append(target[inside])
+            hit[candidate[inside]] = True
+
+        if not points:
+            return empty, empty
+        points = np.concatenate(points)
+        targets = np.concatenate(targets)
+        np.add.at(self.hits, targets, 1)
+        return points, targets
@@ -9,5 +9,17 @@ GREEN = (0, 255, 0)
 GRAVITY = 0.0002  # in pixels/(ms)^2
 HORIZONTAL_SPEED = 0.125  # in pixels per millisecond
 
+# Input settings
+ALTITUDE_SMOOTHING = 219.4  # Time constant of the altitude smoothing in ms
+
 # Game settings
-FPS = 25  # Frames per second
\ No newline at end of file
+FPS = 25  # Frames per second
+PHYSICS_HZ = 240  # Fixed simulation steps per second
+MAX_FRAME_TIME = 250  # Longest frame time simulated in ms, drops the rest under load
+DIMENSIONS = (800, 600)  # Window size in pixels
+GROUND_HEIGHT = 20  # Height of the ground strip in pixels
+
+# Sprite sizes, needed by the simulation when no view is loaded
+PLANE_HEIGHT = 120  # Height of plane.png in pixels
+CLOUD_WIDTH = 127  # Width of cloud.png in pixels
+BOMB_WIDTH = 25  # Width of bomb.png in pixels
\ No newline at end of file
@@ -1,189 +1,197 @@
 import pygame
-import math
-from state import State
 from view import View
-from physics import Physics
+from simulation import Simulation
+from clock import PygameClock, VirtualClock
+from replay import BOMB, AUTO_FIRE
+from telemetry import FRAME_OVERRUN, WARNING
 from constants import *
 
 
 class Controller:
 
-    def __init__(self):
-        self.state = State()
-        self.view = View((800, 600))
-        self.physics = Physics()
+    def __init__(self, dirty_rects=False, profiler=None, clock=None, fps=FPS, recorder=None,
+                 telemetry=None, asset_cache=None, reticle=False):
+        self.view = View(DIMENSIONS, dirty_rects=dirty_rects, fps=fps, asset_cache=asset_cache)
+
+        # The simulation runs on its own clock in fixed steps; the wall clock
+        # only decides how many steps each frame takes
+        self.clock = clock if clock is not None else PygameClock()
+        self.last_time = self.clock.get_ticks()
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.previous_altitude = None
+        self.simulation = Simulation(
+            dimensions=self.view.dimensions,
+            clock=VirtualClock(self.last_time),
+            dt=1000.0 / PHYSICS_HZ,
+            plane_height=self.view.plane_image.get_height(),
+            cloud_width=self.view.cloud_image.get_width(),
+            ground_height=self.view.ground_height,
+            bomb_width=self.view.bomb_image.get_width(),
+            telemetry=telemetry
+        )
+        self.state = self.simulation.state
+        self.telemetry = self.state.telemetry
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.start(self.state.previous_time)
+        self.physics = self.simulation.physics
+        self.reticle = reticle
         self.clouds = [(0, 100), (600, 300), (200, 350)]
-        self.background_period = self.view.dimensions[0] + self.view.cloud_image.get_width()
+
+        # Instruments
+        self.view.add_gauge("variometer", "Vy", self.view.dimensions[0] // 20,
+                            self.view.dimensions[1] // 10, GREEN)
+        self.view.add_gauge("accelerometer", "Ay", self.view.dimensions[0] * 3 // 20,
+                            self.view.dimensions[1] // 10, RED, gain=200)
+
+        # Frame profiling
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self, ["handle_event", "update_game", "render_game"])
+            profiler.instrument(self.view, [name for name in dir(self.view)
+                                            if name.startswith("draw_")]
+                                           + ["update_display"])
+        self.background_period = self.simulation.background_period
 
     def run(self):
         """B52 - Bomber."""
         # Initialize previous values for physics calculations
-        current_time = pygame.time.get_ticks()
+        self.last_time = self.clock.get_ticks()
+        self.accumulator = 0.0
+        current_time = self.simulation.clock.get_ticks()
         self.state.previous_time = current_time
-        self.state.previous_altitude = self.state.plane_altitude
+        if self.recorder is not None:
+            self.recorder.start(current_time)
         
         while True:
+            if self.profiler is not None:
+                self.profiler.begin_frame()
             self.handle_event()
             self.update_game()
             self.render_game()
+            if self.profiler is not None:
+                self.profiler.end_frame()
+
+            # Report frames whose work took longer than the frame budget
+            if self.view.fps:
+                budget = 1000.0 / self.view.fps
+                if self.view.clock.get_rawtime() > budget:
+                    self.telemetry.emit(FRAME_OVERRUN, self.simulation.clock.get_ticks(),
+                                        self.view.clock.get_rawtime(), budget, WARNING)
 
     def handle_event(self):
         """Handle user inputs and events."""
-        current_time = pygame.time.get_ticks()
-        
+        # Coalesce the frame's mouse motions to the latest position
+        motions = pygame.event.get(pygame.MOUSEMOTION)
+        if motions:
+            target_altitude = motions[-1].pos[1]
+            if self.recorder is not None:
+                self.recorder.motion(self.simulation.clock.get_ticks(), target_altitude)
+            self.simulation.move_plane(target_altitude)
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if self.profiler is not None:
+                    self.profiler.close()
+                if self.recorder is not None:
+                    self.recorder.close(self.simulation.clock.get_ticks())
+                self.telemetry.close()
                 pygame.quit()
                 exit()
-            elif event.type == pygame.MOUSEMOTION:
-                # Apply smoothing to plane altitude
-                target_altitude = event.pos[1]
-                max_altitude = self.view.dimensions[1] - 50 - self.view.plane_image.get_height() // 2
-                if target_altitude > max_altitude:
-                    target_altitude = max_altitude
-                
-                self.state.plane_altitude = (self.state.plane_altitude * 5.0 + target_altitude) / 6.0
-                
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_b:
+                    if self.recorder is not None:
+                        self.recorder.record(self.simulation.clock.get_ticks(), BOMB)
                     self.add_bomb()
                 elif event.key == pygame.K_a:
+                    if self.recorder is not None:
+                        self.recorder.record(self.simulation.clock.get_ticks(), AUTO_FIRE)
                     self.try_automatic_fire()
 
     def add_bomb(self):
         """Add a bomb to the state."""
-        current_time = pygame.time.get_ticks()
-        
-        # Calculate offset from the plane's center for bomb dropping
-        offset = self.view.plane_image.get_height() // 2 - 10
-        
-        position = (self.view.dimensions[0] // 2, self.state.plane_altitude + offset)
-
-        bomb_data = {
-            "initial_position": position,
-            "vertical_acceleration": GRAVITY,
-            "initial_depart": current_time,
-        }
-        self.state.add_bomb(bomb_data)
+        self.simulation.add_bomb()
 
     def try_automatic_fire(self):
         """Try to arm automatic fire based on timing calculations."""
-        current_time = pygame.time.get_ticks()
-        
-        # Calculate when the flag will next be at a position where a bomb can hit it
-        period = self.background_period / HORIZONTAL_SPEED
-        next_target_time = -self.view.dimensions[0] / (2.0 * HORIZONTAL_SPEED)
-        
-        while next_target_time < current_time:
-            next_target_time += period
-        
-        # Calculate bomb drop offset
-        offset = self.view.plane_image.get_height() // 2 - 10
-        
-        # Check if a hit is possible and calculate the fire time
-        can_hit, fire_time = self.physics.calculate_fire(
-            self.state.plane_altitude + offset,
-            self.view.dimensions[1],
-            GRAVITY,
-            next_target_time,
-            current_time
-        )
-        
-        if can_hit:
-            self.state.arm_automatic_fire(fire_time)
+        self.simulation.try_automatic_fire()
 
     def update_game(self):
-        """Update the game state."""
-        current_time = pygame.time.get_ticks()
-        
-        # Calculate velocity and acceleration
-        velocity, acceleration = self.physics.calculate_velocity_acceleration(
-            self.state.plane_altitude,
-            current_time,
-            self.state.previous_altitude,
-            self.state.previous_time,
-            self.state.previous_velocity
-        )
-        
-        # Update state with new values
-        self.state.velocity = velocity
-        self.state.acceleration = acceleration
-        self.state.previous_altitude = self.state.plane_altitude
-        self.state.previous_velocity = velocity
-        self.state.previous_time = current_time
-        
-        # Check if it's time for automatic fire
-        if self.state.autoBomb and self.state.autoBomb_time <= current_time:
-            self.add_bomb()
-            self.state.autoBomb = False
-        
-        # Update bombs position and remove old ones
-        self.update_bombs(current_time)
-        self.state.remove_bombs(current_time)
-        self.state.remove_explosions(current_time)
+        """Advance the game state in fixed steps covering the elapsed wall time."""
+        now = self.clock.get_ticks()
+        self.accumulator += min(now - self.last_time, MAX_FRAME_TIME)
+        self.last_time = now
+
+        dt = self.simulation.dt
+        while self.accumulator >= dt:
+            self.previous_altitude = self.state.plane_altitude
+            self.simulation.clock.advance(dt)
+            self.simulation.update()
+            self.accumulator -= dt
+
+        # How far the wall clock is between the last two steps
+        self.alpha = self.accumulator / dt
+
+    def render_time(self):
+        """Return the time rendered, interpolated between the last two steps."""
+        return self.simulation.clock.get_ticks() - (1.0 - self.alpha) * self.simulation.dt
+
+    def render_altitude(self):
+        """Return the plane altitude interpolated between the last two steps."""
+        if self.previous_altitude is None:
+            return self.state.plane_altitude
+        return (self.previous_altitude
+                + (self.state.plane_altitude - self.previous_altitude) * self.alpha)
 
     def update_bombs(self, current_time):
         """Update the positions of all bombs and check for ground contact."""
-        ground_level = self.view.dimensions[1] - self.view.ground_height  # More accurate ground level
-    
-        for bomb in self.state.bombs:
-            # Calculate new position using MRUA physics
-            new_y = self.physics.mrua_1d(
-                bomb["initial_position"][1],
-                bomb["initial_depart"],
-                bomb["vertical_acceleration"],
-                current_time
-            )
-        
-            # Check if bomb hit the ground
-            if new_y >= ground_level:
-                # Create explosion at ground level with the same x-coordinate
-                explosion_pos = (bomb["initial_position"][0], ground_level)
-                self.state.add_explosion(explosion_pos, current_time)
-            
-                # Mark bomb as hit ground so it can be removed
-                bomb["hit_ground"] = True
-            else:
-                # Update bomb position (x position stays constant)
-                bomb["current_position"] = (bomb["initial_position"][0], new_y)
+        self.simulation.update_bombs(current_time)
 
     def render_game(self):
-        """Render the game."""
-        current_time = pygame.time.get_ticks()
+        """Render the game, interpolated between the last two simulation steps."""
+        current_time = self.render_time()
         
         self.view.draw()
         self.view.draw_clouds(self.clouds, current_time)
         
-        # Draw all bombs with their current positions
-        for bomb in self.state.bombs:
-            position = bomb.get("current_position", bomb["initial_position"])
-            self.view.draw_bombs(position)
+        # Draw all bombs at their interpolated positions
+        self.view.draw_bomb_batch(*self.state.bombs.positions_at(self.physics, current_time))
         
         # Draw ground and flag
         self.view.draw_ground(current_time)
         self.view.draw_flag(current_time)
         
+        # Draw the predicted impact points
+        if self.reticle:
+            self.view.draw_reticle(*self.simulation.predict_impacts(current_time=current_time))
+        
         # Draw all explosions
-        for explosion in self.state.explosions:
-            self.view.draw_explosion(explosion["position"])
+        self.view.draw_explosions([explosion.position for explosion in self.state.explosions])
         
         # Draw plane and instruments
-        self.view.draw_plane(self.state.plane_altitude)
+        self.view.draw_plane(self.render_altitude())
         
         # Draw instruments
-        self.view.draw_variometer(self.view.dimensions[0] // 20, 
-                                  self.view.dimensions[1] // 10, 
-                                  self.state.velocity)
-        
-        self.view.draw_accelerometer(self.view.dimensions[0] * 3 // 20, 
-                                     self.view.dimensions[1] // 10, 
-                                     self.state.acceleration)
+        self.view.draw_instruments({
+            "variometer": self.state.velocity,
+            "accelerometer": self.state.acceleration,
+        })
         
-        # Display auto-fire status if armed
+        # Display auto-fire status and the time left before the next drop
         if self.state.autoBomb:
-            self.view.display_text(self.view.dimensions[0] // 20,
-                                  3 * self.view.dimensions[1] // 10,
-                                  "Auto Bombing", BLACK)
+            label = self.view.display_text(self.view.dimensions[0] // 20,
+                                           3 * self.view.dimensions[1] // 10,
+                                           "Auto Bombing", BLACK)
+            self.view.display_number(label.right + 10, label.top,
+                                     max(0.0, self.state.autoBomb_time - current_time) / 1000,
+                                     BLACK, fmt="{:.1f} s")
+
+        # Display frame time statistics
+        if self.profiler is not None and self.profiler.overlay:
+            self.view.display_readout(self.view.dimensions[0] // 2,
+                                      self.view.dimensions[1] // 20,
+                                      self.profiler.summary(), BLACK)
         
         # Update the display
         self.view.update_display()
\ No newline at end of file
@@ -0,0 +1,103 @@
+class KinematicsEstimator:
+    """
+    Streaming velocity and acceleration estimator.
+
+    A constant-acceleration Kalman filter over (position, velocity,
+    acceleration) with white-jerk process noise. Each update costs a
+    fixed number of scalar operations and the filter keeps no history,
+    and since the process noise is derived from the actual time step the
+    estimates behave the same at any tick rate. Samples sharing a
+    timestamp are ignored instead of producing spikes.
+    """
+
+    def __init__(self, jerk_noise=1e-9, measurement_noise=0.25):
+        """
+        Initialize the estimator.
+
+        Args:
+            jerk_noise: Spectral density of the jerk in pixels²/ms⁵; larger
+                values follow changes faster but are noisier
+            measurement_noise: Variance of the measured position in pixels²
+        """
+        self.q = jerk_noise
+        self.r = measurement_noise
+        self.time = None
+        self.reset(0.0)
+
+    def reset(self, position, time=None):
+        """
+        Restart the estimate at rest at the given position.
+
+        Args:
+            position: Current position
+            time: Current time in milliseconds, or None to wait for the
+                first update
+        """
+        self.x = [position, 0.0, 0.0]
+        self.p = [[self.r, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1e-2]]
+        self.time = time
+
+    @property
+    def velocity(self):
+        """Estimated rate of change of the position per millisecond."""
+        return self.x[1]
+
+    @property
+    def acceleration(self):
+        """Estimated rate of change of the velocity per millisecond."""
+        return self.x[2]
+
+    def update(self, time, position):
+        """
+        Add a sample.
+
+        Args:
+            time: Time of the sample in milliseconds
+            position: Measured position
+
+        Returns:
+            tuple: (velocity, acceleration) estimates
+        """
+        if self.time is None:
+            self.reset(position, time)
+            return 0.0, 0.0
+        dt = time - self.time
+        if dt <= 0:
+            return self.x[1], self.x[2]
+        self.time = time
+
+        # Predict: x = F x, P = F P F' + Q
+        x0, x1, x2 = self.x
+        half_dt2 = 0.5 * dt * dt
+        x0 += dt * x1 + half_dt2 * x2
+        x1 += dt * x2
+
+        (p00, p01, p02), (_, p11, p12), (_, _, p22) = self.p
+        # F P
+        a00 = p00 + dt * p01 + half_dt2 * p02
+        a01 = p01 + dt * p11 + half_dt2 * p12
+        a02 = p02 + dt * p12 + half_dt2 * p22
+        a11 = p11 + dt * p12
+        a12 = p12 + dt * p22
+        # (F P) F' + Q, symmetric
+        q = self.q
+        dt2 = dt * dt
+        dt3 = dt2 * dt
+        n00 = a00 + dt * a01 + half_dt2 * a02 + q * dt3 * dt2 / 20
+        n01 = a01 + dt * a02 + q * dt2 * dt2 / 8
+        n02 = a02 + q * dt3 / 6
+        n11 = a11 + dt * a12 + q * dt3 / 3
+        n12 = a12 + q * dt2 / 2
+        n22 = p22 + q * dt
+
+        # Update with the measured position
+        s = n00 + self.r
+        k0, k1, k2 = n00 / s, n01 / s, n02 / s
+        innovation = position - x0
+        self.x = [x0 + k0 * innovation, x1 + k1 * innovation, x2 + k2 * innovation]
+        self.p = [
+            [n00 - k0 * n00, n01 - k0 * n01, n02 - k0 * n02],
+            [0.0, n11 - k1 * n01, n12 - k1 * n02],
+            [0.0, 0.0, n22 - k2 * n02],
+        ]
+        return self.x[1], self.x[2]
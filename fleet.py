@@ -0,0 +1,118 @@
+import numpy as np
+from estimator import KinematicsEstimator
+from constants import *
+
+
+class Fleet:
+    """
+    Array-backed state of many planes, such as AI wingmen.
+
+    Every per-plane quantity is a NumPy array, so steering, altitude
+    smoothing, velocity and acceleration estimates, bomb drops and
+    auto-fire solving are each a single vectorized pass over the fleet.
+    The planes share the simulation's bombs, targets and clock.
+    """
+
+    def __init__(self, simulation, count, x=None, altitude=300.0):
+        """
+        Initialize the fleet.
+
+        Args:
+            simulation: Simulation the planes fly in
+            count: Number of planes
+            x: Horizontal positions of the plane centers; spread across
+                the screen by default
+            altitude: Initial altitude of every plane (scalar or array)
+        """
+        self.simulation = simulation
+        width = simulation.dimensions[0]
+        if x is None:
+            x = np.linspace(0.1 * width, 0.9 * width, count)
+        self.x = np.asarray(x, dtype=float)
+        self.altitude = np.broadcast_to(np.asarray(altitude, dtype=float), (count,)).copy()
+        self.target_altitude = self.altitude.copy()
+        self.velocity = np.zeros(count)
+        self.acceleration = np.zeros(count)
+        self.fire_time = np.full(count, np.inf)  # Armed automatic fire, inf if none
+
+        # The estimator is written with scalar arithmetic only, so it filters
+        # the whole fleet at once when given arrays
+        self.estimator = KinematicsEstimator()
+        self.estimator.update(simulation.clock.get_ticks(), -self.altitude)
+
+    def __len__(self):
+        return len(self.x)
+
+    def steer(self, target_altitude, planes=slice(None)):
+        """
+        Steer planes towards target altitudes, as the mouse does for the player.
+
+        Args:
+            target_altitude: Requested altitudes (scalar or array)
+            planes: Index, mask or slice of the planes to steer
+        """
+        simulation = self.simulation
+        max_altitude = simulation.dimensions[1] - 50 - simulation.plane_height // 2
+        self.target_altitude[planes] = np.minimum(target_altitude, max_altitude)
+
+    def drop_bombs(self, planes=slice(None)):
+        """
+        Drop a bomb from each selected plane at the current time.
+
+        Args:
+            planes: Index array, mask or slice of the planes dropping a bomb
+        """
+        simulation = self.simulation
+        x = self.x[planes]
+        if np.size(x) == 0:
+            return
+        simulation.state.add_bombs(np.atleast_1d(x),
+                                   np.atleast_1d(self.altitude[planes] + simulation.bomb_offset()),
+                                   simulation.gravity,
+                                   simulation.clock.get_ticks())
+
+    def arm_automatic_fire(self, planes=slice(None)):
+        """
+        Arm automatic fire on the flag for the selected planes.
+
+        Planes whose next flag pass cannot be reached anymore stay unarmed,
+        as in Simulation.try_automatic_fire.
+
+        Args:
+            planes: Index array, mask or slice of the planes
+        """
+        simulation = self.simulation
+        physics = simulation.physics
+        current_time = simulation.clock.get_ticks()
+
+        # Time at which the flag passes under each plane
+        phase = (0.0 - self.x[planes]) / simulation.horizontal_speed
+        next_target_time = physics.next_target_time(current_time, simulation.target_period(), phase)
+
+        release = self.altitude[planes] + simulation.bomb_offset()
+        flight_time = np.sqrt(2 * (simulation.dimensions[1] - release) / simulation.gravity)
+        fire_time = next_target_time - flight_time
+
+        armed = self.fire_time[planes]
+        can_hit = (fire_time > current_time) & np.isinf(armed)
+        self.fire_time[planes] = np.where(can_hit, fire_time, armed)
+
+    def update(self, current_time, elapsed_time):
+        """
+        Advance every plane.
+
+        Args:
+            current_time: Current time in milliseconds
+            elapsed_time: Time since the last update in milliseconds
+        """
+        if elapsed_time > 0:
+            weight = 1.0 - np.exp(-elapsed_time / ALTITUDE_SMOOTHING)
+            self.altitude += (self.target_altitude - self.altitude) * weight
+
+        # Negative because up is decreasing y
+        self.velocity, self.acceleration = self.estimator.update(current_time, -self.altitude)
+
+        due = self.fire_time <= current_time
+        if due.any():
+            self.drop_bombs(due)
+            self.fire_time[due] = np.inf
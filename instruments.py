@@ -0,0 +1,156 @@
+import pygame
+from constants import *
+
+
+class Gauge:
+    """Vertical bar instrument such as the variometer or accelerometer."""
+
+    def __init__(self, name, label, x, y, color, gain=1.0,
+                 width=40, height=100, thickness=2):
+        """
+        Initialize the gauge.
+
+        Args:
+            name: Key used to pass the gauge its value
+            label: Text displayed above the gauge
+            x: Horizontal position of the gauge background
+            y: Vertical position of the gauge background
+            color: RGB color of the indicator bar
+            gain: Factor applied to the value before display
+            width: Width of the gauge in pixels
+            height: Height of the gauge in pixels
+            thickness: Half-thickness of the indicator bar in pixels
+        """
+        self.name = name
+        self.label = label
+        self.x = x
+        self.y = y
+        self.color = color
+        self.gain = gain
+        self.width = width
+        self.height = height
+        self.thickness = thickness
+        self.value = 0.0
+        self.bounds = None
+
+    def chrome(self, text_cache, text_size):
+        """
+        Return the static parts of the gauge: labels and background.
+
+        Args:
+            text_cache: TextCache used to render the labels
+            text_size: Height of the font in pixels
+
+        Returns:
+            tuple: (list of (surface, position) labels, background rect)
+        """
+        labels = [
+            (text_cache.render(self.label, BLACK), (self.x + 10, self.y - 20)),
+            (text_cache.render("0-", BLACK),
+             (self.x - 20, self.y + (self.height - text_size) // 2)),
+        ]
+        background = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.bounds = background.unionall(
+            [surface.get_rect(topleft=position) for surface, position in labels])
+        return labels, background
+
+    def indicator_rect(self, value):
+        """
+        Return the screen area of the indicator bar for a new value.
+
+        Args:
+            value: Value of the measured quantity
+        """
+        self.value = value * self.gain
+
+        # Calculate indicator position
+        indicator = int((self.value + 1.0) * self.height / 2.0)
+
+        # Clamp indicator position
+        if indicator < self.thickness:
+            indicator = self.thickness
+        elif indicator >= self.height - self.thickness:
+            indicator = self.height - self.thickness
+
+        return pygame.Rect(self.x, self.y + self.height - indicator - self.thickness,
+                           self.width, 2 * self.thickness)
+
+
+class InstrumentPanel:
+    """
+    A set of gauges whose static chrome is baked into one cached surface.
+
+    Each frame costs one blit for the chrome of all gauges plus one fill
+    per indicator bar, however many gauges the panel holds.
+    """
+
+    def __init__(self, text_cache, text_size):
+        """
+        Initialize an empty panel.
+
+        Args:
+            text_cache: TextCache used to render the labels
+            text_size: Height of the font in pixels
+        """
+        self.text_cache = text_cache
+        self.text_size = text_size
+        self.gauges = {}
+        self.surface = None
+        self.bounds = None
+
+    def add(self, gauge):
+        """
+        Add or replace a gauge and invalidate the baked chrome.
+
+        Args:
+            gauge: Gauge to add, keyed by its name
+        """
+        self.gauges[gauge.name] = gauge
+        self.surface = None
+        return gauge
+
+    def bake(self):
+        """Render the chrome of every gauge into the cached surface."""
+        chrome = [gauge.chrome(self.text_cache, self.text_size)
+                  for gauge in self.gauges.values()]
+        bounds = [gauge.bounds for gauge in self.gauges.values()]
+        self.bounds = bounds[0].unionall(bounds[1:])
+
+        ox, oy = self.bounds.topleft
+        self.surface = pygame.Surface(self.bounds.size, pygame.SRCALPHA)
+        for labels, background in chrome:
+            for surface, (x, y) in labels:
+                self.surface.blit(surface, (x - ox, y - oy))
+            self.surface.fill(BLACK, background.move(-ox, -oy))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+    def draw(self, screen, values, names=None):
+        """
+        Draw the panel.
+
+        Args:
+            screen: Surface to draw on
+            values: Dictionary mapping gauge names to their raw values
+            names: Gauges to draw; all of them when None
+
+        Returns:
+            list: Screen areas that were drawn
+        """
+        if not self.gauges:
+            return []
+        if self.surface is None:
+            self.bake()
+
+        if names is None:
+            gauges = self.gauges.values()
+            rects = [screen.blit(self.surface, self.bounds.topleft)]
+        else:
+            gauges = [self.gauges[name] for name in names]
+            rects = [screen.blit(self.surface, gauge.bounds.topleft,
+                                 gauge.bounds.move(-self.bounds.x, -self.bounds.y))
+                     for gauge in gauges]
+
+        for gauge in gauges:
+            screen.fill(gauge.color, gauge.indicator_rect(values.get(gauge.name, 0.0)))
+        return rects
@@ -0,0 +1,174 @@
+"""
+Fast-startup launcher.
+
+Each mode imports only what it needs: `headless` never imports pygame,
+and `play` initializes only the display and font modules instead of
+every pygame subsystem (audio, joystick, ...). With --startup-report the
+time spent in each startup phase is printed to stderr.
+
+    python launcher.py play [--dirty-rects] [--profile] [--record LOG] ...
+    python launcher.py headless [--ticks N] [--replay LOG]
+    python launcher.py bench [bench.py arguments]
+"""
+import argparse
+import os
+import sys
+import time
+
+START = time.perf_counter()
+
+
+class StartupTimer:
+    """Measures the time spent in each startup phase."""
+
+    def __init__(self, enabled):
+        """
+        Initialize the timer.
+
+        Args:
+            enabled: Whether report() prints anything
+        """
+        self.enabled = enabled
+        self.last = START
+        self.phases = []
+
+    def mark(self, phase):
+        """
+        Close the current phase.
+
+        Args:
+            phase: Name of the phase that just ended
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        """Print the phase durations to stderr."""
+        if not self.enabled:
+            return
+        for phase, duration in self.phases:
+            print(f"startup {phase:<12} {duration * 1000:8.1f} ms", file=sys.stderr)
+        print(f"startup {'total':<12} {(self.last - START) * 1000:8.1f} ms", file=sys.stderr)
+
+
+def play(args, timer):
+    """Play the game in a window."""
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from controller import Controller
+    from telemetry import TelemetryBus
+    timer.mark("import")
+
+    profiler = None
+    if args.profile or args.profile_csv:
+        from profiler import FrameProfiler
+        profiler = FrameProfiler(csv_path=args.profile_csv, overlay=args.profile)
+    recorder = None
+    if args.record:
+        from replay import Recorder
+        recorder = Recorder(args.record)
+    telemetry = TelemetryBus(args.telemetry, format=args.telemetry_format).start()
+
+    controller = Controller(dirty_rects=args.dirty_rects, profiler=profiler,
+                            recorder=recorder, telemetry=telemetry,
+                            asset_cache=args.asset_cache, reticle=args.reticle)
+    timer.mark("init")
+    timer.report()
+    controller.run()
+
+
+def headless(args, timer):
+    """Run the simulation without pygame and report its speed."""
+    from simulation import Simulation
+    timer.mark("import")
+
+    if args.replay:
+        from replay import read, replay
+        dt, records = read(args.replay)
+        timer.mark("init")
+        timer.report()
+        start = time.perf_counter()
+        simulation = replay(records, dt)
+        ticks = round((simulation.clock.get_ticks() - records[0][0]) / dt) if records else 0
+    else:
+        simulation = Simulation()
+        fleet = simulation.add_fleet(args.planes) if args.planes else None
+        timer.mark("init")
+        timer.report()
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            if args.bomb_every and tick % args.bomb_every == 0:
+                simulation.add_bomb()
+                if fleet is not None:
+                    fleet.arm_automatic_fire()
+            simulation.step()
+        ticks = args.ticks
+    elapsed = time.perf_counter() - start
+
+    print(f"{ticks} ticks in {elapsed:.3f} s ({ticks / max(elapsed, 1e-9):.0f} ticks/s), "
+          f"{len(simulation.state.bombs)} bombs in the air")
+
+
+def bench(args, timer):
+    """Run the benchmark suite."""
+    import bench as bench_module
+    timer.mark("import")
+    timer.report()
+    return bench_module.main(args.bench_args)
+
+
+def main(argv=None):
+    """Parse the command line and start the selected mode."""
+    parser = argparse.ArgumentParser(description="B2 - Bomber launcher.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print the time spent in each startup phase")
+    # Also accepted after the mode; SUPPRESS keeps a flag given before it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--startup-report", action="store_true", default=argparse.SUPPRESS,
+                        help="print the time spent in each startup phase")
+    modes = parser.add_subparsers(dest="mode")
+
+    play_parser = modes.add_parser("play", parents=[common], help="play the game (default)")
+    play_parser.add_argument("--dirty-rects", action="store_true",
+                             help="only update the changed areas of the screen")
+    play_parser.add_argument("--profile", action="store_true",
+                             help="show frame time percentiles on screen")
+    play_parser.add_argument("--profile-csv", help="write per-frame timings to this CSV file")
+    play_parser.add_argument("--record", help="record the session to this log")
+    play_parser.add_argument("--telemetry", help="write telemetry to this file, - for stdout")
+    play_parser.add_argument("--telemetry-format", choices=("jsonl", "binary"), default="jsonl")
+    play_parser.add_argument("--asset-cache", help="directory of the raw-pixel image cache")
+    play_parser.add_argument("--reticle", action="store_true",
+                             help="show where bombs released now would land")
+
+    headless_parser = modes.add_parser("headless", parents=[common],
+                                      help="run the simulation without display")
+    headless_parser.add_argument("--ticks", type=int, default=10000, help="ticks to simulate")
+    headless_parser.add_argument("--bomb-every", type=int, default=0,
+                                 help="drop a bomb every N ticks")
+    headless_parser.add_argument("--planes", type=int, default=0,
+                                 help="fly this many extra planes, auto-firing with the bombs")
+    headless_parser.add_argument("--replay", help="replay this session log instead")
+
+    bench_parser = modes.add_parser("bench", parents=[common], help="run the benchmarks")
+    bench_parser.add_argument("bench_args", nargs=argparse.REMAINDER,
+                              help="arguments passed to bench.py")
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args, extra = parser.parse_known_args(argv)
+    if args.mode is None:
+        args, extra = parser.parse_known_args(argv + ["play"])
+    if extra:
+        # REMAINDER does not take a leading option, e.g. bench --frames 50
+        if args.mode != "bench":
+            parser.error("unrecognized arguments: " + " ".join(extra))
+        args.bench_args = extra + args.bench_args
+    timer = StartupTimer(args.startup_report)
+    timer.mark("launcher")
+
+    modes = {"play": play, "headless": headless, "bench": bench}
+    return modes[args.mode](args, timer)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,4 @@
-from controller import Controller
-
-def main():
-    """Entry point of the application."""
-    controller = Controller()
-    controller.run()
+from launcher import main
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
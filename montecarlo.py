@@ -0,0 +1,223 @@
+"""
+Monte Carlo evaluation of auto-fire accuracy.
+
+Runs headless sessions across a multiprocessing pool, sweeping plane
+altitude, gravity, horizontal speed and input jitter. Every session arms
+automatic fire through Simulation.try_automatic_fire and measures how far
+from the flag the bomb's trajectory meets the ground, and separately
+whether it hit the flag's hitbox. Parameters and results live in
+shared-memory arrays that the workers write into directly, so nothing
+but chunk bounds is pickled between processes:
+
+    python montecarlo.py --altitudes 100,200,300 --jitter 0,5 --repeats 50
+"""
+import argparse
+import itertools
+import json
+import math
+import sys
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from clock import VirtualClock
+from constants import *
+
+# Columns of the parameter array
+ALTITUDE, GRAVITY_COLUMN, SPEED, JITTER, SEED = range(5)
+# Columns of the result array
+FIRED, HIT, MISS, FLIGHT = range(4)
+
+
+def run_session(altitude, gravity, speed, jitter, seed, dt=1000.0 / PHYSICS_HZ):
+    """
+    Run one auto-fire session.
+
+    Args:
+        altitude: Plane altitude the mouse aims at
+        gravity: Vertical acceleration of the bombs in pixels/(ms)^2
+        speed: Scrolling speed of the ground in pixels/ms
+        jitter: Standard deviation of the mouse position in pixels
+        seed: Seed of the session's random generator
+        dt: Simulation time step in milliseconds
+
+    Returns:
+        tuple: (fired, hit, miss distance in pixels, flight time in ms);
+            miss and flight are NaN when no bomb was fired
+    """
+    from simulation import Simulation
+    rng = np.random.default_rng(int(seed))
+
+    # Start at a random point of the flag's period
+    period = (DIMENSIONS[0] + CLOUD_WIDTH) / speed
+    simulation = Simulation(clock=VirtualClock(rng.uniform(0, period)), dt=dt,
+                            gravity=gravity, horizontal_speed=speed)
+    state = simulation.state
+    state.plane_altitude = state.target_altitude = altitude
+
+    simulation.try_automatic_fire()
+    if not state.autoBomb:
+        return 0.0, 0.0, math.nan, math.nan
+
+    # Fly until the bomb has been dropped and is gone
+    fire_time = state.autoBomb_time
+    release = None
+    for _ in range(int((period + 10000) / dt)):
+        if jitter:
+            simulation.move_plane(altitude + rng.normal(0.0, jitter))
+        simulation.step()
+        if release is None:
+            if not state.autoBomb:
+                slots, _, _ = state.bombs.live()
+                release = state.bombs.y0[slots[0]], state.bombs.depart[slots[0]]
+        elif len(state.bombs) == 0:
+            break
+    else:
+        return 1.0, 0.0, math.nan, math.nan
+
+    # The bomb is removed as soon as it enters the flag's hitbox, so the miss
+    # is measured where its trajectory crosses the ground level instead
+    y0, depart = release
+    ground_level = DIMENSIONS[1] - GROUND_HEIGHT
+    impact_time = depart + math.sqrt(2 * (ground_level - y0) / gravity)
+
+    # Signed distance between the bomb and the flag centers, wrapped to one period
+    flag_center = simulation.targets.positions(impact_time)[0] + 10
+    bomb_center = DIMENSIONS[0] // 2 + simulation.bomb_width / 2
+    background_period = simulation.background_period
+    miss = (bomb_center - flag_center + background_period / 2) % background_period \
+        - background_period / 2
+    hit = float(simulation.targets.hits[0] > 0)
+    return 1.0, hit, miss, impact_time - fire_time
+
+
+def _attach(name, shape):
+    """Open a shared-memory block as a float64 array."""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _run_chunk(task):
+    """Worker: run the sessions [start, stop) and write their results in place."""
+    params_name, results_name, count, start, stop = task
+    params_block, params = _attach(params_name, (count, 5))
+    results_block, results = _attach(results_name, (count, 4))
+    try:
+        for i in range(start, stop):
+            results[i] = run_session(*params[i])
+    finally:
+        del params, results
+        params_block.close()
+        results_block.close()
+    return stop - start
+
+
+def sweep(altitudes, gravities, speeds, jitters, repeats, workers=None, chunk=16, seed=0):
+    """
+    Run every combination of parameters repeats times.
+
+    Args:
+        altitudes: Plane altitudes
+        gravities: Bomb accelerations
+        speeds: Horizontal speeds
+        jitters: Input jitter standard deviations
+        repeats: Sessions per combination
+        workers: Number of processes, os.cpu_count() by default
+        chunk: Sessions per task
+        seed: Base seed of the sessions
+
+    Returns:
+        tuple: (params, results) arrays with one row per session
+    """
+    grid = list(itertools.product(altitudes, gravities, speeds, jitters))
+    count = len(grid) * repeats
+    params_block = shared_memory.SharedMemory(create=True, size=max(1, count * 5 * 8))
+    results_block = shared_memory.SharedMemory(create=True, size=max(1, count * 4 * 8))
+    try:
+        params = np.ndarray((count, 5), dtype=np.float64, buffer=params_block.buf)
+        results = np.ndarray((count, 4), dtype=np.float64, buffer=results_block.buf)
+        params[:, :4] = np.repeat(np.array(grid, dtype=np.float64).reshape(-1, 4), repeats, axis=0)
+        params[:, SEED] = seed + np.arange(count)
+
+        tasks = [(params_block.name, results_block.name, count, start, min(start + chunk, count))
+                 for start in range(0, count, chunk)]
+        with Pool(workers) as pool:
+            for _ in pool.imap_unordered(_run_chunk, tasks):
+                pass
+        return params.copy(), results.copy()
+    finally:
+        params = results = None
+        params_block.close()
+        params_block.unlink()
+        results_block.close()
+        results_block.unlink()
+
+
+def summarize(params, results):
+    """
+    Aggregate miss statistics overall and per parameter combination.
+
+    Args:
+        params: Parameter array returned by sweep()
+        results: Result array returned by sweep()
+
+    Returns:
+        dict: JSON-serializable statistics
+    """
+    def stats(rows):
+        fired = results[rows, FIRED] > 0
+        miss = np.abs(results[rows][fired & ~np.isnan(results[rows, MISS]), MISS])
+        entry = {
+            "sessions": int(rows.sum()),
+            "fired": int(fired.sum()),
+            "hit_rate": float(results[rows, HIT].sum() / max(1, fired.sum())),
+        }
+        if len(miss):
+            entry.update({
+                "miss_mean": float(miss.mean()),
+                "miss_std": float(miss.std()),
+                "miss_p50": float(np.percentile(miss, 50)),
+                "miss_p95": float(np.percentile(miss, 95)),
+                "miss_max": float(miss.max()),
+            })
+        return entry
+
+    keys = params[:, :SEED]
+    combinations = np.unique(keys, axis=0)
+    return {
+        "overall": stats(np.ones(len(params), dtype=bool)),
+        "by_parameters": [
+            dict(zip(("altitude", "gravity", "speed", "jitter"), map(float, combination)),
+                 **stats(np.all(keys == combination, axis=1)))
+            for combination in combinations
+        ],
+    }
+
+
+def _floats(text):
+    return [float(value) for value in text.split(",")]
+
+
+def main(argv=None):
+    """Run a parameter sweep and print the statistics as JSON."""
+    parser = argparse.ArgumentParser(description="Monte Carlo auto-fire accuracy.")
+    parser.add_argument("--altitudes", type=_floats, default=[100, 200, 300, 400])
+    parser.add_argument("--gravity", type=_floats, default=[GRAVITY])
+    parser.add_argument("--speed", type=_floats, default=[HORIZONTAL_SPEED])
+    parser.add_argument("--jitter", type=_floats, default=[0.0, 5.0])
+    parser.add_argument("--repeats", type=int, default=25, help="sessions per combination")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON statistics to this file")
+    args = parser.parse_args(argv)
+
+    params, results = sweep(args.altitudes, args.gravity, args.speed, args.jitter,
+                            args.repeats, args.workers, seed=args.seed)
+    report = json.dumps(summarize(params, results), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
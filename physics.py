@@ -1,33 +1,7 @@
 import math
+import numpy as np
 
 class Physics:
-    def calculate_velocity_acceleration(self, altitude, current_time, previous_position, previous_time, previous_velocity):
-        """
-        Calculate velocity and acceleration based on altitude and time.
-        Matches the original implementation.
-        
-        Args:
-            altitude: Current altitude of the plane
-            current_time: Current time in milliseconds
-            previous_position: Previous altitude
-            previous_time: Previous time in milliseconds
-            previous_velocity: Previous velocity
-            
-        Returns:
-            tuple: (velocity, acceleration)
-        """
-        # Avoid division by zero
-        if current_time == previous_time:
-            return 0, 0
-            
-        # Calculate vertical velocity (negative because up is decreasing y)
-        velocity = -(altitude - previous_position) / (current_time - previous_time)
-        
-        # Calculate acceleration
-        acceleration = (velocity - previous_velocity) / (current_time - previous_time)
-        
-        return velocity, acceleration
-
     def mrua_1d(self, depart, depart_time, acceleration, current_time):
         """
         Calculate the position of an object under constant acceleration.
@@ -47,6 +21,29 @@ class Physics:
         
         return position
 
+    def mrua_1d_batch(self, depart, depart_time, acceleration, current_time, out=None):
+        """
+        Vectorized mrua_1d over arrays of objects sharing the same clock.
+        p = p0 + 0.5 * a * t²
+        
+        Args:
+            depart: Array of initial positions
+            depart_time: Array of initial times in milliseconds
+            acceleration: Array (or scalar) of constant accelerations
+            current_time: Current time in milliseconds
+            out: Optional array receiving the result, avoiding an allocation
+            
+        Returns:
+            numpy.ndarray: Current positions
+        """
+        out = np.subtract(current_time, depart_time, out=out)
+        np.square(out, out=out)
+        np.multiply(out, acceleration, out=out)
+        out *= 0.5
+        out += depart
+        
+        return out
+
     def calculate_fire(self, altitude_release, altitude_target, acceleration, next_target_time, current_time):
         """
         Calculate if a shot is possible and when to fire.
@@ -74,6 +71,71 @@ class Physics:
         # Shot not possible with current parameters
         return False, 0
 
+    def next_target_time(self, current_time, period, phase):
+        """
+        Calculate in O(1) the next time a periodic target is in position.
+        
+        The target is in position at phase + k * period for every integer k.
+        Arrays of phases are solved element-wise.
+        
+        Args:
+            current_time: Current time in milliseconds
+            period: Time between two passes in milliseconds
+            phase: Time of any pass in milliseconds (scalar or array)
+            
+        Returns:
+            float: First pass at or after current_time
+        """
+        return phase + np.ceil((current_time - phase) / period) * period
+
+    def fire_schedule(self, altitudes_release, altitude_target, acceleration,
+                      phases, period, current_time, windows=1):
+        """
+        Solve firing times for several targets and release altitudes at once.
+        
+        For every release altitude and every target, the next `windows`
+        passes that can still be reached are computed in closed form.
+        
+        Args:
+            altitudes_release: Candidate release altitudes (scalar or array)
+            altitude_target: Target altitude (ground level)
+            acceleration: Gravitational acceleration
+            phases: Time of any pass of each target in milliseconds (scalar or array)
+            period: Time between two passes of a target in milliseconds
+            current_time: Current time in milliseconds
+            windows: Number of upcoming passes considered per target
+            
+        Returns:
+            numpy.ndarray: Structured array with fields fire_time,
+                impact_time, altitude (release altitude), target (index
+                into phases) and window (index k of the pass at
+                phase + k * period), sorted by fire_time
+        """
+        altitudes = np.atleast_1d(np.asarray(altitudes_release, dtype=float))
+        phases = np.atleast_1d(np.asarray(phases, dtype=float))
+        
+        # Time of flight for each altitude, shape (A, 1, 1)
+        flight_time = np.sqrt(2 * (altitude_target - altitudes) / acceleration)[:, None, None]
+        
+        # First pass whose fire time is strictly in the future, shape (A, T, 1)
+        first = np.floor((current_time + flight_time - phases[None, :, None]) / period) + 1
+        
+        # All considered passes, shape (A, T, W)
+        window = first + np.arange(windows)
+        impact_time = phases[None, :, None] + window * period
+        fire_time = impact_time - flight_time
+        
+        schedule = np.empty(fire_time.size, dtype=[("fire_time", float), ("impact_time", float),
+                                                  ("altitude", float), ("target", np.int32),
+                                                  ("window", np.int64)])
+        schedule["fire_time"] = fire_time.ravel()
+        schedule["impact_time"] = impact_time.ravel()
+        schedule["altitude"] = np.broadcast_to(altitudes[:, None, None], fire_time.shape).ravel()
+        schedule["target"] = np.broadcast_to(np.arange(len(phases))[None, :, None],
+                                             fire_time.shape).ravel()
+        schedule["window"] = window.ravel()
+        return schedule[np.argsort(schedule["fire_time"], kind="stable")]
+
     def calculate_impact_point(self, initial_position, initial_velocity, acceleration, time):
         """
         Calculate the impact point of a projectile.
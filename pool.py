@@ -0,0 +1,47 @@
+class Explosion:
+    """An explosion shown for a short time where a bomb hit."""
+
+    __slots__ = ("position", "time_created")
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.time_created = 0
+
+
+class Pool:
+    """
+    Free list of reusable objects.
+
+    Objects are preallocated up front and handed back with release(), so
+    steady-state gameplay does not allocate. The pool only grows when more
+    objects are alive at once than were ever alive before.
+    """
+
+    def __init__(self, factory, size=64):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Callable creating a new object
+            size: Number of objects preallocated
+        """
+        self.factory = factory
+        self.free = [factory() for _ in range(size)]
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self):
+        """Return an object from the free list, creating one if it is empty."""
+        if self.free:
+            return self.free.pop()
+        return self.factory()
+
+    def release(self, obj):
+        """
+        Return an object to the free list.
+
+        Args:
+            obj: Object previously obtained from acquire()
+        """
+        self.free.append(obj)
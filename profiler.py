@@ -0,0 +1,141 @@
+import csv
+import time
+import numpy as np
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timing with a fixed-size ring buffer.
+
+    Instrumented methods add their duration, measured with
+    time.perf_counter_ns, to the current frame. end_frame() stores the
+    frame in the ring buffer and optionally streams it to a CSV file.
+    """
+
+    def __init__(self, capacity=1024, csv_path=None, overlay=False):
+        """
+        Initialize the profiler.
+
+        Args:
+            capacity: Number of frames kept in the ring buffer
+            csv_path: File receiving one row per frame, or None
+            overlay: Whether the controller should draw the statistics
+        """
+        self.capacity = capacity
+        self.overlay = overlay
+        self.columns = ["frame"]  # Column 0 holds the whole frame time
+        self.current = [0]
+        self.samples = np.zeros((capacity, 1), dtype=np.int64)
+        self.frames = 0
+        self.frame_start = None
+
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path is not None:
+            self.csv_file = open(csv_path, "w", newline="")
+            self.csv_writer = csv.writer(self.csv_file)
+
+    def register(self, name):
+        """
+        Add a timed column.
+
+        Args:
+            name: Column name
+
+        Returns:
+            int: Index of the column
+        """
+        if name in self.columns:
+            return self.columns.index(name)
+        self.columns.append(name)
+        self.current.append(0)
+        self.samples = np.hstack([self.samples,
+                                  np.zeros((self.capacity, 1), dtype=np.int64)])
+        return len(self.columns) - 1
+
+    def instrument(self, obj, names):
+        """
+        Replace methods of an object by timed wrappers.
+
+        Args:
+            obj: Object whose methods are timed
+            names: Names of the methods to time
+        """
+        for name in names:
+            setattr(obj, name, self.timed(getattr(obj, name), self.register(name)))
+
+    def timed(self, method, column):
+        """Return a wrapper adding the duration of method to a column."""
+        current = self.current
+        counter = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            start = counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[column] += counter() - start
+
+        return wrapper
+
+    def begin_frame(self):
+        """Start timing a frame."""
+        self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        """Store the frame in the ring buffer and reset the counters."""
+        current = self.current
+        current[0] = time.perf_counter_ns() - self.frame_start
+        self.samples[self.frames % self.capacity] = current
+
+        if self.csv_writer is not None:
+            if self.frames == 0:
+                self.csv_writer.writerow(["index"] + [name + "_ns" for name in self.columns])
+            self.csv_writer.writerow([self.frames] + current)
+
+        self.frames += 1
+        for i in range(len(current)):
+            current[i] = 0
+
+    def recent(self, column="frame"):
+        """
+        Return the samples of a column still held in the ring buffer.
+
+        Args:
+            column: Column name
+
+        Returns:
+            numpy.ndarray: Durations in nanoseconds, oldest first
+        """
+        index = self.columns.index(column)
+        count = min(self.frames, self.capacity)
+        start = self.frames % self.capacity if self.frames > self.capacity else 0
+        return np.roll(self.samples[:count, index], -start)
+
+    def percentiles(self, column="frame", q=(50, 95, 99)):
+        """
+        Return percentiles of a column in milliseconds.
+
+        Args:
+            column: Column name
+            q: Percentiles to compute
+
+        Returns:
+            list: One value per percentile, zeros when no frame was recorded
+        """
+        samples = self.recent(column)
+        if len(samples) == 0:
+            return [0.0] * len(q)
+        return (np.percentile(samples, q) / 1e6).tolist()
+
+    def summary(self):
+        """Return the frame time percentiles as a short text line."""
+        p50, p95, p99 = self.percentiles()
+        return f"p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} ms"
+
+    def close(self):
+        """Flush and close the CSV file."""
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
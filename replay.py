@@ -0,0 +1,173 @@
+"""
+Deterministic input recording and replay.
+
+A session log is a small header holding the fixed time step, followed by
+fixed-size records (time, kind, value): the start and end of the session,
+mouse altitudes and K_b/K_a presses. The updates themselves are not
+recorded: the Controller steps the simulation from the start time in
+fixed steps, so replaying regenerates them up to each input and feeds the
+inputs back through the same Simulation methods on a virtual clock. A
+session reproduces exactly and runs as fast as the CPU allows:
+
+    python replay.py session.b52
+"""
+import argparse
+import struct
+import sys
+import time
+from clock import VirtualClock
+from constants import *
+
+MAGIC = b"B52R"
+VERSION = 2
+HEADER = struct.Struct("<4sB3xd")  # magic, version, time step in ms
+RECORD = struct.Struct("<dBh")  # time in ms, kind, value
+
+# Record kinds
+MOTION = 0  # value: target altitude
+BOMB = 1  # K_b
+AUTO_FIRE = 2  # K_a
+END = 3  # Time of the last update
+START = 4  # Time reference of the first update
+
+
+class Recorder:
+    """Writes a session log while the game is played."""
+
+    def __init__(self, path, dt=1000.0 / PHYSICS_HZ):
+        """
+        Open the log and write its header.
+
+        Args:
+            path: File receiving the session log
+            dt: Fixed time step of the recorded simulation in milliseconds
+        """
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, dt))
+        self.pack = RECORD.pack
+
+    def record(self, current_time, kind, value=0):
+        """
+        Append a record.
+
+        Args:
+            current_time: Time of the input in milliseconds
+            kind: One of MOTION, BOMB, AUTO_FIRE, END or START
+            value: Payload, the altitude for MOTION records
+        """
+        self.file.write(self.pack(current_time, kind, value))
+
+    def motion(self, current_time, altitude):
+        """Record a MOUSEMOTION to the given altitude."""
+        self.record(current_time, MOTION, altitude)
+
+    def start(self, current_time):
+        """Record the time the first update measures elapsed time from."""
+        self.record(current_time, START)
+
+    def close(self, current_time=None):
+        """
+        Flush and close the log.
+
+        Args:
+            current_time: Time of the last update, so a replay runs the
+                steps after the last input; None if unknown
+        """
+        if not self.file.closed:
+            if current_time is not None:
+                self.record(current_time, END)
+            self.file.close()
+
+
+def read(path):
+    """
+    Read a session log.
+
+    Args:
+        path: File holding the session log
+
+    Returns:
+        tuple: (dt, records), the fixed time step in milliseconds and the
+            list of (time, kind, value) records
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = struct.unpack_from("<4sB", data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a session log")
+    if version != VERSION:
+        raise ValueError(f"unsupported session log version {version}")
+    dt = HEADER.unpack_from(data)[2]
+    body = memoryview(data)[HEADER.size:]
+    body = body[:len(body) - len(body) % RECORD.size]  # Drop a truncated tail
+    return dt, list(RECORD.iter_unpack(body))
+
+
+def replay(records, dt, simulation=None, on_frame=None):
+    """
+    Replay records through a simulation driven by a virtual clock.
+
+    Args:
+        records: (time, kind, value) records, as returned by read()
+        dt: Fixed time step of the session, as returned by read()
+        simulation: Simulation to drive; a new headless one by default
+        on_frame: Optional callable run after every replayed update,
+            e.g. a renderer
+
+    Returns:
+        Simulation: The simulation in its final state
+    """
+    if simulation is None:
+        from simulation import Simulation
+        simulation = Simulation(dt=dt)
+    simulation.dt = dt
+    if not isinstance(simulation.clock, VirtualClock):
+        simulation.clock = VirtualClock()
+    clock = simulation.clock
+
+    if records:
+        clock.time = records[0][0]
+        simulation.state.previous_time = clock.time
+
+    for current_time, kind, value in records:
+        if kind == START:
+            clock.time = current_time
+            simulation.state.previous_time = current_time
+            continue
+        # Regenerate the fixed steps the Controller ran before this record;
+        # they repeat its additions of dt, so the times match exactly
+        while clock.time < current_time - dt / 2:
+            simulation.step()
+            if on_frame is not None:
+                on_frame(simulation)
+        if kind == MOTION:
+            simulation.move_plane(value)
+        elif kind == BOMB:
+            simulation.add_bomb()
+        elif kind == AUTO_FIRE:
+            simulation.try_automatic_fire()
+    return simulation
+
+
+def main(argv=None):
+    """Replay a session log at maximum speed and print a summary."""
+    parser = argparse.ArgumentParser(description="Replay a recorded session.")
+    parser.add_argument("log", help="session log written by Recorder")
+    args = parser.parse_args(argv)
+
+    dt, records = read(args.log)
+    start = time.perf_counter()
+    simulation = replay(records, dt)
+    elapsed = time.perf_counter() - start
+
+    session = simulation.clock.get_ticks() - records[0][0] if records else 0.0
+    frames = round(session / dt)
+    print(f"{len(records)} records, {frames} frames, {session / 1000:.1f} s of play "
+          f"replayed in {elapsed:.3f} s")
+    print(f"final altitude {simulation.state.plane_altitude:.2f}, "
+          f"{len(simulation.state.bombs)} bombs in the air")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
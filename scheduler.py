@@ -0,0 +1,54 @@
+import heapq
+
+
+class Scheduler:
+    """
+    Binary-heap priority queue of timed events.
+
+    Scheduling and popping cost O(log n), and each tick only touches the
+    events that are due. Events due at the same time come out in the
+    order they were scheduled.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler."""
+        self.heap = []
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, time, kind, payload=None):
+        """
+        Schedule an event.
+
+        Args:
+            time: Time in milliseconds when the event is due
+            kind: Event type
+            payload: Data handed back with the event
+        """
+        heapq.heappush(self.heap, (time, self.counter, kind, payload))
+        self.counter += 1
+
+    def next_time(self):
+        """Return the time of the earliest event, or None if there is none."""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, current_time):
+        """
+        Remove and yield the events due at or before current_time.
+
+        Args:
+            current_time: Current time in milliseconds
+
+        Yields:
+            tuple: (time, kind, payload) in time order
+        """
+        heap = self.heap
+        while heap and heap[0][0] <= current_time:
+            time, _, kind, payload = heapq.heappop(heap)
+            yield time, kind, payload
+
+    def clear(self):
+        """Drop every pending event."""
+        self.heap.clear()
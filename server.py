@@ -0,0 +1,459 @@
+"""
+Authoritative game server.
+
+Runs the Simulation on an asyncio loop and serves it over local TCP.
+Clients send input messages equivalent to the MOUSEMOTION and K_b/K_a
+handling in Controller.handle_event, and receive binary state snapshots
+at a configurable tick rate. Snapshots are delta-compressed against the
+previous tick: bombs follow analytic trajectories, so only spawns and
+removals are sent, along with the plane altitudes that moved and the
+new explosions. Each tick's delta is encoded once and the same bytes go
+to every client. Clients joining or falling behind get a keyframe.
+
+    python server.py serve --port 5252 --tick-rate 30
+    python server.py bots --port 5252 --count 200 --duration 10
+"""
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import numpy as np
+from clock import VirtualClock
+from constants import *
+
+# Framing: payload length, message type
+FRAME = struct.Struct("<IB")
+
+# Client to server
+HELLO = 1  # payload: role
+MOTION = 2  # payload: int16 target altitude
+BOMB = 3  # K_b
+AUTO_FIRE = 4  # K_a
+# Server to client
+WELCOME = 10  # payload: plane index (-1 for spectators), gravity
+KEYFRAME = 11
+DELTA = 12
+
+SPECTATOR = 0
+PLAYER = 1
+
+WELCOME_BODY = struct.Struct("<hd")
+MOTION_BODY = struct.Struct("<h")
+# Payload size of each client message
+INPUT_SIZES = {HELLO: 1, MOTION: MOTION_BODY.size, BOMB: 0, AUTO_FIRE: 0}
+MAX_INPUT = max(INPUT_SIZES.values())
+KEYFRAME_HEADER = struct.Struct("<IdIII")  # tick, time, planes, bombs, explosions
+DELTA_HEADER = struct.Struct("<IdIIII")  # tick, time, altitudes, new bombs, removed, explosions
+BOMB_DTYPE = np.dtype([("slot", "<u4"), ("x", "<f4"), ("y0", "<f4"),
+                       ("depart", "<f8"), ("acceleration", "<f4")])
+EXPLOSION_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("time", "<f8")])
+
+
+def frame(kind, payload=b""):
+    """Return a framed message."""
+    return FRAME.pack(len(payload), kind) + payload
+
+
+async def read_frame(reader, max_length=None):
+    """
+    Read one framed message.
+
+    Args:
+        reader: asyncio StreamReader
+        max_length: Largest payload accepted, or None for any
+
+    Returns:
+        tuple: (kind, payload)
+
+    Raises:
+        ValueError: If the payload is longer than max_length
+    """
+    length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if max_length is not None and length > max_length:
+        raise ValueError(f"message of {length} bytes")
+    return kind, await reader.readexactly(length) if length else b""
+
+
+class SnapshotEncoder:
+    """Encodes keyframes and per-tick deltas of a simulation's state."""
+
+    def __init__(self, simulation, altitude_epsilon=0.25):
+        """
+        Initialize the encoder.
+
+        Args:
+            simulation: Simulation to encode
+            altitude_epsilon: Smallest altitude change worth sending, in pixels
+        """
+        self.simulation = simulation
+        self.altitude_epsilon = altitude_epsilon
+        self.sent_altitudes = self.altitudes().copy()
+        bombs = simulation.state.bombs
+        self.alive = bombs.alive[:bombs.size].copy()
+        self.generation = bombs.generation[:bombs.size].copy()
+        self.time = simulation.clock.get_ticks()
+
+    def altitudes(self):
+        """Return the altitude of every plane, the player's first."""
+        simulation = self.simulation
+        player = np.array([simulation.state.plane_altitude])
+        if simulation.fleet is None:
+            return player
+        return np.concatenate([player, simulation.fleet.altitude])
+
+    def _bombs(self, slots):
+        bombs = self.simulation.state.bombs
+        records = np.empty(len(slots), dtype=BOMB_DTYPE)
+        records["slot"] = slots
+        records["x"] = bombs.x[slots]
+        records["y0"] = bombs.y0[slots]
+        records["depart"] = bombs.depart[slots]
+        records["acceleration"] = bombs.acceleration[slots]
+        return records.tobytes()
+
+    def _explosions(self, explosions):
+        records = np.empty(len(explosions), dtype=EXPLOSION_DTYPE)
+        for i, explosion in enumerate(explosions):
+            records[i] = (explosion.position[0], explosion.position[1], explosion.time_created)
+        return records.tobytes()
+
+    def keyframe(self, tick):
+        """Return the full state as a KEYFRAME message."""
+        state = self.simulation.state
+        altitudes = self.altitudes().astype("<f4")
+        slots = np.flatnonzero(state.bombs.alive[:state.bombs.size])
+        return frame(KEYFRAME, b"".join([
+            KEYFRAME_HEADER.pack(tick, self.simulation.clock.get_ticks(), len(altitudes),
+                                 len(slots), len(state.explosions)),
+            altitudes.tobytes(),
+            self._bombs(slots),
+            self._explosions(state.explosions),
+        ]))
+
+    def delta(self, tick):
+        """Return the changes since the previous call as a DELTA message."""
+        state = self.simulation.state
+        current_time = self.simulation.clock.get_ticks()
+
+        # Planes that moved noticeably
+        altitudes = self.altitudes()
+        moved = np.flatnonzero(np.abs(altitudes - self.sent_altitudes) > self.altitude_epsilon)
+        self.sent_altitudes[moved] = altitudes[moved]
+
+        # Bomb spawns and removals, from the alive flags and slot generations
+        bombs = state.bombs
+        size = bombs.size
+        alive = bombs.alive[:size]
+        generation = bombs.generation[:size]
+        previous_alive = np.zeros(size, dtype=bool)
+        previous_generation = np.zeros(size, dtype=generation.dtype)
+        n = min(size, len(self.alive))
+        previous_alive[:n] = self.alive[:n]
+        previous_generation[:n] = self.generation[:n]
+        reused = generation != previous_generation
+        spawned = np.flatnonzero(alive & (reused | ~previous_alive))
+        removed = np.flatnonzero(previous_alive & (reused | ~alive))
+        # Bombs alive beyond the current size were all removed
+        removed = np.concatenate([removed, np.flatnonzero(self.alive[size:]) + size])
+        self.alive = alive.copy()
+        self.generation = generation.copy()
+
+        # Explosions created since the previous delta, the newest last
+        explosions = []
+        for explosion in reversed(state.explosions):
+            if explosion.time_created <= self.time:
+                break
+            explosions.append(explosion)
+        explosions.reverse()
+        self.time = current_time
+
+        return frame(DELTA, b"".join([
+            DELTA_HEADER.pack(tick, current_time, len(moved), len(spawned), len(removed),
+                              len(explosions)),
+            moved.astype("<u2").tobytes(),
+            altitudes[moved].astype("<f4").tobytes(),
+            self._bombs(spawned),
+            removed.astype("<u4").tobytes(),
+            self._explosions(explosions),
+        ]))
+
+
+class Client:
+    """Server-side connection state."""
+
+    def __init__(self, writer, plane):
+        self.writer = writer
+        self.plane = plane
+        self.needs_keyframe = True
+
+
+class GameServer:
+    """Runs the simulation and broadcasts snapshots to the connected clients."""
+
+    def __init__(self, tick_rate=30, max_players=256, max_buffer=1 << 20):
+        """
+        Initialize the server.
+
+        Args:
+            tick_rate: Snapshots per second
+            max_players: Number of controllable planes
+            max_buffer: Bytes queued for a client before it is considered
+                behind and resynchronized with a keyframe
+        """
+        from simulation import Simulation
+        self.tick_rate = tick_rate
+        self.max_buffer = max_buffer
+        self.simulation = Simulation(clock=VirtualClock(), dt=1000.0 / PHYSICS_HZ)
+        if max_players > 1:
+            self.simulation.add_fleet(max_players - 1)
+        self.encoder = SnapshotEncoder(self.simulation)
+        self.free_planes = list(range(max_players - 1, -1, -1))
+        self.clients = set()
+        self.tick = 0
+        self.server = None
+
+    def handle_input(self, client, kind, payload):
+        """
+        Apply a client's input to its plane, as Controller.handle_event does.
+
+        Raises:
+            ValueError: If the message is not a well-formed input
+        """
+        if kind == HELLO or INPUT_SIZES.get(kind) != len(payload):
+            raise ValueError(f"malformed input message of type {kind}")
+        if client.plane is None:
+            return
+        simulation = self.simulation
+        fleet_plane = client.plane - 1
+        if kind == MOTION:
+            (altitude,) = MOTION_BODY.unpack(payload)
+            if client.plane == 0:
+                simulation.move_plane(altitude)
+            else:
+                simulation.fleet.steer(altitude, fleet_plane)
+        elif kind == BOMB:
+            if client.plane == 0:
+                simulation.add_bomb()
+            else:
+                simulation.fleet.drop_bombs([fleet_plane])
+        elif kind == AUTO_FIRE:
+            if client.plane == 0:
+                simulation.try_automatic_fire()
+            else:
+                simulation.fleet.arm_automatic_fire([fleet_plane])
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection."""
+        client = None
+        try:
+            kind, payload = await read_frame(reader, MAX_INPUT)
+            if kind != HELLO or len(payload) != INPUT_SIZES[HELLO]:
+                return
+            plane = None
+            if payload and payload[0] == PLAYER and self.free_planes:
+                plane = self.free_planes.pop()
+            client = Client(writer, plane)
+            writer.write(frame(WELCOME, WELCOME_BODY.pack(-1 if plane is None else plane,
+                                                          self.simulation.gravity)))
+            self.clients.add(client)
+            while True:
+                kind, payload = await read_frame(reader, MAX_INPUT)
+                self.handle_input(client, kind, payload)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Disconnected, or dropped for sending a malformed message
+        finally:
+            if client is not None:
+                self.clients.discard(client)
+                if client.plane is not None:
+                    self.free_planes.append(client.plane)
+            writer.close()
+
+    def broadcast(self):
+        """Send this tick's delta to every client, keyframes to those that need one."""
+        delta = self.encoder.delta(self.tick)
+        keyframe = None
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                client.needs_keyframe = True
+                continue
+            if client.needs_keyframe:
+                if keyframe is None:
+                    keyframe = self.encoder.keyframe(self.tick)
+                client.writer.write(keyframe)
+                client.needs_keyframe = False
+            else:
+                client.writer.write(delta)
+
+    async def run(self, host="127.0.0.1", port=5252, duration=None):
+        """
+        Serve until cancelled or for a given duration.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port, 0 for any free port
+            duration: Seconds to run, or None to run forever
+        """
+        loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        period = 1.0 / self.tick_rate
+        start = last = loop.time()
+        accumulator = 0.0
+        try:
+            while duration is None or loop.time() - start < duration:
+                now = loop.time()
+                accumulator += min(now - last, MAX_FRAME_TIME / 1000.0)
+                last = now
+                while accumulator * 1000.0 >= self.simulation.dt:
+                    self.simulation.step()
+                    accumulator -= self.simulation.dt / 1000.0
+                self.tick += 1
+                self.broadcast()
+                await asyncio.sleep(max(0.0, start + self.tick * period - loop.time()))
+        finally:
+            self.server.close()
+            for client in list(self.clients):
+                client.writer.close()
+            await self.server.wait_closed()
+
+
+class Mirror:
+    """Client-side copy of the server state, rebuilt from snapshots."""
+
+    def __init__(self):
+        self.tick = None
+        self.time = 0.0
+        self.altitudes = np.zeros(0, dtype=np.float32)
+        self.bombs = {}  # slot -> (x, y0, depart, acceleration)
+        self.explosions = []  # (x, y, time_created)
+
+    def apply(self, kind, payload):
+        """Apply a KEYFRAME or DELTA message."""
+        if kind == KEYFRAME:
+            tick, self.time, planes, bombs, explosions = KEYFRAME_HEADER.unpack_from(payload)
+            offset = KEYFRAME_HEADER.size
+            self.altitudes = np.frombuffer(payload, "<f4", planes, offset).copy()
+            offset += 4 * planes
+            records = np.frombuffer(payload, BOMB_DTYPE, bombs, offset)
+            offset += BOMB_DTYPE.itemsize * bombs
+            self.bombs = {int(r["slot"]): (r["x"], r["y0"], r["depart"], r["acceleration"])
+                          for r in records}
+            self.explosions = np.frombuffer(payload, EXPLOSION_DTYPE, explosions, offset).tolist()
+        elif kind == DELTA:
+            if self.tick is None:
+                return  # Wait for the first keyframe
+            tick, self.time, moved, spawned, removed, explosions = DELTA_HEADER.unpack_from(payload)
+            offset = DELTA_HEADER.size
+            indices = np.frombuffer(payload, "<u2", moved, offset)
+            offset += 2 * moved
+            self.altitudes[indices] = np.frombuffer(payload, "<f4", moved, offset)
+            offset += 4 * moved
+            records = np.frombuffer(payload, BOMB_DTYPE, spawned, offset)
+            offset += BOMB_DTYPE.itemsize * spawned
+            slots = np.frombuffer(payload, "<u4", removed, offset)
+            offset += 4 * removed
+            for slot in slots.tolist():
+                self.bombs.pop(slot, None)
+            for r in records:
+                self.bombs[int(r["slot"])] = (r["x"], r["y0"], r["depart"], r["acceleration"])
+            self.explosions.extend(np.frombuffer(payload, EXPLOSION_DTYPE, explosions,
+                                                 offset).tolist())
+        else:
+            return
+        self.tick = tick
+        self.explosions = [e for e in self.explosions if e[2] > self.time - 500]
+
+
+async def run_bot(host, port, duration, role=PLAYER, seed=None):
+    """
+    Connect a bot that steers randomly and drops bombs.
+
+    Args:
+        host: Server address
+        port: Server port
+        duration: Seconds to play
+        role: PLAYER or SPECTATOR
+        seed: Seed of the bot's random generator
+
+    Returns:
+        Mirror: The bot's copy of the game state when it disconnects
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(frame(HELLO, bytes([role])))
+    kind, payload = await read_frame(reader)
+    plane, _ = WELCOME_BODY.unpack(payload)
+    mirror = Mirror()
+
+    async def receive():
+        while True:
+            kind, payload = await read_frame(reader)
+            mirror.apply(kind, payload)
+
+    receiver = asyncio.ensure_future(receive())
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    try:
+        while loop.time() < end and not receiver.done():
+            if plane >= 0:
+                writer.write(frame(MOTION, MOTION_BODY.pack(rng.randint(50, 500))))
+                roll = rng.random()
+                if roll < 0.05:
+                    writer.write(frame(BOMB))
+                elif roll < 0.07:
+                    writer.write(frame(AUTO_FIRE))
+            await asyncio.sleep(0.05)
+    finally:
+        receiver.cancel()
+        writer.close()
+    return mirror
+
+
+async def run_bots(host, port, count, duration, spectators=0):
+    """Run count player bots and some spectators concurrently."""
+    return await asyncio.gather(
+        *[run_bot(host, port, duration, PLAYER, seed) for seed in range(count)],
+        *[run_bot(host, port, duration, SPECTATOR) for _ in range(spectators)],
+        return_exceptions=True)
+
+
+def main(argv=None):
+    """Run the server or a swarm of bots."""
+    parser = argparse.ArgumentParser(description="B2 - Bomber game server.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    serve = modes.add_parser("serve", help="run the authoritative server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=5252)
+    serve.add_argument("--tick-rate", type=int, default=30)
+    serve.add_argument("--max-players", type=int, default=256)
+    serve.add_argument("--duration", type=float, help="seconds to run (default: forever)")
+    bots = modes.add_parser("bots", help="connect bot clients")
+    bots.add_argument("--host", default="127.0.0.1")
+    bots.add_argument("--port", type=int, default=5252)
+    bots.add_argument("--count", type=int, default=10, help="player bots")
+    bots.add_argument("--spectators", type=int, default=0)
+    bots.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        server = GameServer(args.tick_rate, args.max_players)
+        try:
+            asyncio.run(server.run(args.host, args.port, args.duration))
+        except KeyboardInterrupt:
+            pass
+    else:
+        results = asyncio.run(run_bots(args.host, args.port, args.count, args.duration,
+                                       args.spectators))
+        mirrors = [result for result in results if isinstance(result, Mirror)]
+        print(f"{len(mirrors)}/{len(results)} bots finished, last tick "
+              f"{max((m.tick or 0) for m in mirrors) if mirrors else None}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
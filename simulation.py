@@ -0,0 +1,290 @@
+import math
+import numpy as np
+import snapshot
+from state import State
+from physics import Physics
+from clock import VirtualClock
+from collision import TargetField
+from fleet import Fleet
+from constants import *
+
+
+class Simulation:
+    """Game logic around State and Physics, independent of any display."""
+
+    def __init__(self, dimensions=DIMENSIONS, clock=None, dt=1000.0 / FPS,
+                 plane_height=PLANE_HEIGHT, cloud_width=CLOUD_WIDTH,
+                 ground_height=GROUND_HEIGHT, bomb_width=BOMB_WIDTH, telemetry=None,
+                 gravity=GRAVITY, horizontal_speed=HORIZONTAL_SPEED):
+        """
+        Initialize the simulation.
+
+        Args:
+            dimensions: (width, height) of the play field in pixels
+            clock: Object with get_ticks(); defaults to a VirtualClock
+            dt: Fixed time step in milliseconds used by step()
+            plane_height: Height of the plane sprite in pixels
+            cloud_width: Width of the cloud sprite in pixels
+            ground_height: Height of the ground strip in pixels
+            bomb_width: Width of the bomb sprite in pixels
+            telemetry: TelemetryBus receiving game events
+            gravity: Vertical acceleration of the bombs in pixels/(ms)^2
+            horizontal_speed: Scrolling speed of the ground in pixels/ms
+        """
+        self.state = State(telemetry)
+        self.physics = Physics()
+        self.clock = clock if clock is not None else VirtualClock()
+        self.dt = dt
+        self.dimensions = dimensions
+        self.plane_height = plane_height
+        self.ground_height = ground_height
+        self.bomb_width = bomb_width
+        self.gravity = gravity
+        self.horizontal_speed = horizontal_speed
+        self.background_period = dimensions[0] + cloud_width
+        self.observers = []
+        self.fleet = None
+
+        # Targets scrolling with the background, starting with the flag
+        self.targets = TargetField(self.background_period, horizontal_speed)
+        self.targets.add(0, 20, dimensions[1] - 50, dimensions[1] - 10)
+
+        self.state.previous_time = self.clock.get_ticks()
+
+    def add_observer(self, observer):
+        """
+        Register a callback run after every update.
+
+        Args:
+            observer: Callable taking the simulation as its only argument
+        """
+        self.observers.append(observer)
+
+    def add_fleet(self, count, x=None, altitude=300.0):
+        """
+        Add a fleet of planes updated together with the player's plane.
+
+        Args:
+            count: Number of planes
+            x: Horizontal positions of the plane centers
+            altitude: Initial altitude of the planes
+
+        Returns:
+            Fleet: The new fleet
+        """
+        self.fleet = Fleet(self, count, x, altitude)
+        return self.fleet
+
+    def bomb_offset(self):
+        """Return the offset from the plane's center where bombs are dropped."""
+        return self.plane_height // 2 - 10
+
+    def move_plane(self, target_altitude):
+        """
+        Steer the plane towards a target altitude, as the mouse does.
+        The plane only moves in update(), so calling this several times
+        per frame costs nothing more than the last call.
+
+        Args:
+            target_altitude: Requested vertical position of the plane
+        """
+        max_altitude = self.dimensions[1] - 50 - self.plane_height // 2
+        if target_altitude > max_altitude:
+            target_altitude = max_altitude
+
+        self.state.target_altitude = target_altitude
+
+    def smooth_altitude(self, elapsed_time):
+        """
+        Move the plane towards its target altitude with exponential smoothing.
+
+        The smoothing depends on elapsed time only, not on how many input
+        events arrived. ALTITUDE_SMOOTHING matches the former per-event
+        (5 * altitude + target) / 6 filter with one event per 25 FPS frame.
+
+        Args:
+            elapsed_time: Time since the last update in milliseconds
+        """
+        if elapsed_time <= 0:
+            return
+        weight = 1.0 - math.exp(-elapsed_time / ALTITUDE_SMOOTHING)
+        self.state.plane_altitude += (self.state.target_altitude - self.state.plane_altitude) * weight
+
+    def add_bomb(self):
+        """Drop a bomb from the plane at the current time."""
+        current_time = self.clock.get_ticks()
+
+        position = (self.dimensions[0] // 2, self.state.plane_altitude + self.bomb_offset())
+        self.state.add_bomb(position, self.gravity, current_time)
+
+    def try_automatic_fire(self):
+        """Arm automatic fire for the first target pass that can still be reached."""
+        schedule = self.plan_automatic_fire(windows=1)
+        if len(schedule):
+            shot = schedule[0]
+            self.state.arm_automatic_fire(float(shot["fire_time"]),
+                                          (int(shot["target"]), int(shot["window"])))
+
+    def target_period(self):
+        """Return the time in milliseconds between two passes of a target."""
+        return self.background_period / self.horizontal_speed
+
+    def target_phase(self, x):
+        """
+        Return a time at which a target is under the plane.
+
+        Args:
+            x: Horizontal position of the target at time 0 (0 for the flag)
+        """
+        return (x - self.dimensions[0] / 2.0) / self.horizontal_speed
+
+    def plan_automatic_fire(self, targets=None, altitudes=None, windows=4):
+        """
+        Compute a ranked firing schedule for several targets.
+
+        Args:
+            targets: Horizontal positions of the targets at time 0; those
+                of the target field by default
+            altitudes: Candidate plane altitudes; the current one by default
+            windows: Number of upcoming passes considered per target
+
+        Returns:
+            numpy.ndarray: Schedule as returned by Physics.fire_schedule
+        """
+        if targets is None:
+            targets = self.targets.x0
+        if altitudes is None:
+            altitudes = self.state.plane_altitude
+        phases = self.target_phase(np.asarray(targets, dtype=float))
+        return self.physics.fire_schedule(
+            np.asarray(altitudes, dtype=float) + self.bomb_offset(),
+            self.dimensions[1],
+            self.gravity,
+            phases,
+            self.target_period(),
+            self.clock.get_ticks(),
+            windows
+        )
+
+    def predict_impacts(self, count=256, spacing=1000.0 / FPS, current_time=None):
+        """
+        Predict where bombs released now and at the next candidate times
+        would land, assuming the plane keeps its altitude.
+
+        All candidates are solved in one NumPy batch through
+        Physics.calculate_impact_point, in the frame of the scrolling ground.
+
+        Args:
+            count: Number of candidate release times
+            spacing: Time between two candidates in milliseconds
+            current_time: Time of the first candidate; the clock's time by default
+
+        Returns:
+            tuple: (screen_x, miss) arrays; screen_x is where each bomb
+                lands in today's screen coordinates, miss its signed
+                distance from the left edge of the nearest flag
+        """
+        if current_time is None:
+            current_time = self.clock.get_ticks()
+        ground_level = self.dimensions[1] - self.ground_height
+        release_altitude = self.state.plane_altitude + self.bomb_offset()
+        flight_time = math.sqrt(max(0.0, 2 * (ground_level - release_altitude) / self.gravity))
+
+        # Bombs are released from the middle of the screen; the ground scrolls left
+        release_time = current_time + spacing * np.arange(count)
+        bomb_x = self.dimensions[0] // 2 + self.bomb_width / 2
+        flag_x = self.targets.positions(current_time)[0]
+        start = bomb_x + self.horizontal_speed * (release_time - current_time)
+
+        impact_x, _ = self.physics.calculate_impact_point(
+            (start, release_altitude),
+            (self.horizontal_speed, 0.0),
+            (0.0, self.gravity),
+            flight_time
+        )
+
+        period = self.background_period
+        miss = (impact_x - flag_x + period / 2) % period - period / 2
+        return impact_x, miss
+
+    def update(self):
+        """Advance the game state to the clock's current time."""
+        current_time = self.clock.get_ticks()
+
+        # Follow the mouse
+        elapsed_time = current_time - self.state.previous_time
+        self.smooth_altitude(elapsed_time)
+        if self.fleet is not None:
+            self.fleet.update(current_time, elapsed_time)
+
+        # Estimate velocity and acceleration (negative because up is decreasing y)
+        velocity, acceleration = self.state.estimator.update(current_time,
+                                                             -self.state.plane_altitude)
+
+        # Update state with new values
+        self.state.velocity = velocity
+        self.state.acceleration = acceleration
+        self.state.previous_time = current_time
+
+        # Fire the armed automatic shots that are due and remove old bombs and explosions
+        for _ in range(self.state.process_events(current_time)):
+            self.add_bomb()
+
+        # Update bombs position
+        self.update_bombs(current_time)
+
+        for observer in self.observers:
+            observer(self)
+
+    def update_bombs(self, current_time):
+        """Update the positions of all bombs and check for target and ground contact."""
+        ground_level = self.dimensions[1] - self.ground_height
+
+        # Move every bomb in one vectorized pass; bombs reaching the ground are removed
+        hit_x = self.state.bombs.update(self.physics, current_time, ground_level)
+
+        # Create explosions at ground level with the same x-coordinate
+        for x in hit_x.tolist():
+            self.state.add_explosion((x, ground_level), current_time)
+
+        # Bombs hitting a target with the middle of their sprite explode where they are
+        if len(self.state.bombs) == 0:
+            return
+        slots, x, y = self.state.bombs.live()
+        hit, _ = self.targets.collide(x + self.bomb_width / 2, y, current_time)
+        if len(hit):
+            self.state.bombs.release(slots[hit])
+            for position in zip(x[hit].tolist(), y[hit].tolist()):
+                self.state.add_explosion(position, current_time)
+
+    def step(self):
+        """Advance the virtual clock by one fixed time step and update."""
+        self.clock.advance(self.dt)
+        self.update()
+
+    def snapshot(self):
+        """Return a binary snapshot of the state, see snapshot.py."""
+        return snapshot.snapshot(self.state)
+
+    def restore(self, data, copy=True):
+        """
+        Restore the state from a snapshot and move a virtual clock back
+        to the time it was taken.
+
+        Args:
+            data: Snapshot returned by snapshot()
+            copy: Whether to copy the bomb arrays out of data
+        """
+        snapshot.restore(self.state, data, copy)
+        if isinstance(self.clock, VirtualClock):
+            self.clock.time = self.state.previous_time
+
+    def run(self, ticks):
+        """
+        Run the simulation headless as fast as possible.
+
+        Args:
+            ticks: Number of fixed time steps to simulate
+        """
+        for _ in range(ticks):
+            self.step()
@@ -0,0 +1,222 @@
+"""
+Binary snapshots of the game state.
+
+A snapshot is a small versioned header, a block of scalars and counts,
+then the raw buffers of the bomb store, armed fires, explosions and
+pending fire and explosion events, every section 8-byte aligned. Bomb
+expiry events are not stored: they follow from the release times of the
+live bombs, and restore replaces them with a vectorized sweep over the
+store. Taking one is a handful of buffer copies and restoring can map the
+bomb arrays straight onto the snapshot memory, so checkpoints are cheap
+enough to take every tick. SnapshotRing keeps the most recent ones in memory for rewinding:
+
+    ring = SnapshotRing(240)
+    ring.push(simulation.state)
+    ...
+    ring.rewind(simulation.state, time)
+"""
+import math
+import struct
+from collections import deque
+import numpy as np
+from state import FIRE
+
+MAGIC = b"B52S"
+VERSION = 4
+HEADER = struct.Struct("<4sB3x")
+# Plane, last update time, estimator mean, covariance upper triangle and time
+SCALARS = struct.Struct("<15d")
+# Allocated bomb slots, used slots, live bombs, free slots, armed fires,
+# explosions, events, scheduler counter
+COUNTS = struct.Struct("<8q")
+
+BOMB_ARRAYS = ("x", "y0", "y", "depart", "acceleration")
+# Fire events hold their (target, pass) window, explosion events the
+# position of their explosion in the deque
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("counter", "<i8"), ("kind", "<i8"),
+                        ("a", "<i8"), ("b", "<i8")])
+ARMED_DTYPE = np.dtype([("target", "<i8"), ("window", "<i8"), ("fire_time", "<f8")])
+
+
+def _padded(n):
+    """Round a byte count up to the next multiple of 8."""
+    return (n + 7) & ~7
+
+
+def snapshot(state):
+    """
+    Serialize a State.
+
+    Args:
+        state: State to serialize
+
+    Returns:
+        bytearray: The snapshot
+    """
+    bombs = state.bombs
+    capacity = bombs.capacity()
+    estimator = state.estimator
+    (p00, p01, p02), (_, p11, p12), (_, _, p22) = estimator.p
+
+    # Fire and explosion events, payloads flattened into numbers
+    explosion_index = {id(explosion): i for i, explosion in enumerate(state.explosions)}
+    heap = state.scheduler.heap
+    events = np.zeros(len(heap), dtype=EVENT_DTYPE)
+    rows = []
+    for time, counter, kind, payload in heap:
+        if kind == FIRE:
+            rows.append((time, counter, kind) + payload)
+        else:
+            rows.append((time, counter, kind, explosion_index[id(payload)], 0))
+    if rows:
+        events[:] = rows
+
+    explosions = np.array([(e.position[0], e.position[1], e.time_created)
+                           for e in state.explosions], dtype=np.float64).reshape(-1, 3)
+    armed = np.array([window + (fire_time,) for window, fire_time in state.armed_fires.items()],
+                     dtype=ARMED_DTYPE)
+    # Bomb arrays at full capacity, so generations above the high-water
+    # mark survive and reused slots never repeat one
+    sections = [getattr(bombs, name) for name in BOMB_ARRAYS]
+    sections += [bombs.generation, bombs.alive, np.array(bombs.free, dtype="<i8"),
+                 armed, explosions, events]
+
+    # Copy every section once, straight into the snapshot
+    offset = HEADER.size + SCALARS.size + COUNTS.size
+    data = bytearray(offset + sum(_padded(section.nbytes) for section in sections))
+    HEADER.pack_into(data, 0, MAGIC, VERSION)
+    SCALARS.pack_into(data, HEADER.size, state.plane_altitude, state.target_altitude,
+                      state.previous_time, state.velocity, state.acceleration, *estimator.x,
+                      p00, p01, p02, p11, p12, p22,
+                      math.nan if estimator.time is None else estimator.time)
+    COUNTS.pack_into(data, HEADER.size + SCALARS.size, capacity, bombs.size, bombs.count,
+                     len(bombs.free), len(armed), len(explosions), len(events),
+                     state.scheduler.counter)
+    for section in sections:
+        dtype = section.dtype if section.dtype.names else section.dtype.newbyteorder("<")
+        np.frombuffer(data, dtype, section.size, offset).reshape(section.shape)[...] = section
+        offset += _padded(section.nbytes)
+    return data
+
+
+def restore(state, data, copy=True):
+    """
+    Restore a State from a snapshot.
+
+    Args:
+        state: State to overwrite
+        data: Snapshot returned by snapshot()
+        copy: If False and data is writable, the bomb arrays become views
+            of data instead of copies; data must then not be reused
+
+    Raises:
+        ValueError: If data is not a snapshot of a supported version
+    """
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a state snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported state snapshot version {version}")
+    offset = HEADER.size
+    scalars = SCALARS.unpack_from(data, offset)
+    offset += SCALARS.size
+    capacity, size, count, n_free, n_armed, n_explosions, n_events, counter = \
+        COUNTS.unpack_from(data, offset)
+    offset += COUNTS.size
+    copy = copy or isinstance(data, bytes)
+
+    def take(dtype, n, pad=False):
+        nonlocal offset
+        array = np.frombuffer(data, dtype, n, offset)
+        nbytes = array.nbytes
+        offset += _padded(nbytes) if pad else nbytes
+        return array.copy() if copy else array
+
+    (state.plane_altitude, state.target_altitude, state.previous_time, state.velocity,
+     state.acceleration, x0, x1, x2, p00, p01, p02, p11, p12, p22, estimator_time) = scalars
+    estimator = state.estimator
+    estimator.x = [x0, x1, x2]
+    estimator.p = [[p00, p01, p02], [0.0, p11, p12], [0.0, 0.0, p22]]
+    estimator.time = None if math.isnan(estimator_time) else estimator_time
+
+    bombs = state.bombs
+    for name in BOMB_ARRAYS:
+        setattr(bombs, name, take("<f8", capacity))
+    bombs.generation = take("<i8", capacity)
+    bombs.alive = take(np.bool_, capacity, pad=True)
+    bombs.mask = np.zeros(capacity, dtype=bool)
+    bombs.size = size
+    bombs.count = count
+    bombs.free = np.frombuffer(data, "<i8", n_free, offset).tolist()
+    offset += 8 * n_free
+
+    state.armed_fires = {(target, window): fire_time for target, window, fire_time
+                         in np.frombuffer(data, ARMED_DTYPE, n_armed, offset).tolist()}
+    offset += ARMED_DTYPE.itemsize * n_armed
+
+    pool = state.explosion_pool
+    for explosion in state.explosions:
+        pool.release(explosion)
+    state.explosions.clear()
+    for x, y, time_created in np.frombuffer(data, "<f8", 3 * n_explosions,
+                                            offset).reshape(-1, 3).tolist():
+        explosion = pool.acquire()
+        explosion.position = (x, y)
+        explosion.time_created = time_created
+        state.explosions.append(explosion)
+    offset += 24 * n_explosions
+
+    events = np.frombuffer(data, EVENT_DTYPE, n_events, offset)
+    explosions = state.explosions
+    # The heap is stored in list order, which is still a valid heap
+    state.scheduler.heap = [
+        (time, event_counter, kind, (a, b) if kind == FIRE else explosions[a])
+        for time, event_counter, kind, a, b in events.tolist()]
+    state.scheduler.counter = counter
+    state.schedule_bomb_expiries()
+
+
+class SnapshotRing:
+    """Fixed-size ring of in-memory snapshots, for rewinding."""
+
+    def __init__(self, capacity=256):
+        """
+        Initialize an empty ring.
+
+        Args:
+            capacity: Number of snapshots kept; older ones are dropped
+        """
+        self.snapshots = deque(maxlen=capacity)  # (time, snapshot), oldest first
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def push(self, state):
+        """
+        Take a snapshot of a State, stamped with its last update time.
+
+        Args:
+            state: State to snapshot
+        """
+        self.snapshots.append((state.previous_time, snapshot(state)))
+
+    def rewind(self, state, time=None):
+        """
+        Restore the latest snapshot taken at or before a given time and
+        drop the newer ones.
+
+        Args:
+            state: State to overwrite
+            time: Time in milliseconds, or None for the latest snapshot
+
+        Returns:
+            float: Time of the restored snapshot, or None if there is none
+        """
+        snapshots = self.snapshots
+        while snapshots and time is not None and snapshots[-1][0] > time:
+            snapshots.pop()
+        if not snapshots:
+            return None
+        snapshot_time, data = snapshots[-1]
+        restore(state, data)
+        return snapshot_time
@@ -1,88 +1,201 @@
+from collections import deque
+import numpy as np
+from bomb_store import BombStore
+from estimator import KinematicsEstimator
+from pool import Pool, Explosion
+from scheduler import Scheduler
+from telemetry import TelemetryBus, EXPLOSION, BOMB_DROP, BOMBS_DROP, AUTO_FIRE_ARM, AUTO_FIRE
+
+# Lifetimes in milliseconds
+BOMB_LIFETIME = 3000
+EXPLOSION_LIFETIME = 500
+
+# Scheduled event types
+FIRE = 0
+BOMB_EXPIRY = 1
+EXPLOSION_EXPIRY = 2
+BOMBS_EXPIRY = 3
+BOMB_SWEEP = 4
+
+
 class State:
-    def __init__(self):
-        """Initialize the game state with default values."""
+    def __init__(self, telemetry=None):
+        """
+        Initialize the game state with default values.
+        
+        Args:
+            telemetry: TelemetryBus receiving game events; an in-memory
+                one by default
+        """
         # Plane properties
         self.plane_altitude = 300
-        self.previous_altitude = 300
-        self.previous_velocity = 0.0
+        self.target_altitude = 300
         self.previous_time = 0
         self.velocity = 0.0
         self.acceleration = 0.0
+        self.estimator = KinematicsEstimator()
         
         # Bombs
-        self.bombs = []
+        self.bombs = BombStore()
         
-        # Auto-bombing
-        self.autoBomb = False
-        self.autoBomb_time = 0
-        self.explosions = [] 
+        # Auto-bombing: fire time of each armed target pass still pending
+        self.armed_fires = {}
+        self.explosions = deque()
+        self.explosion_pool = Pool(Explosion)
+
+        # Armed fire times and explosion lifetimes
+        self.scheduler = Scheduler()
+        # Bomb lifetimes, kept apart since they follow from the bomb store
+        self.bomb_expiries = Scheduler()
+
+        self.telemetry = telemetry if telemetry is not None else TelemetryBus()
+
+    @property
+    def autoBomb(self):
+        """Whether at least one automatic fire is armed."""
+        return bool(self.armed_fires)
 
-    def add_bomb(self, bomb):
+    @property
+    def autoBomb_time(self):
+        """Time of the next armed automatic fire, 0 if none is armed."""
+        return min(self.armed_fires.values()) if self.armed_fires else 0
+
+    def add_bomb(self, position, acceleration, depart_time):
         """
-        Add a bomb to the list of bombs.
+        Add a bomb to the bomb store and schedule its expiry.
         
         Args:
-            bomb: Dictionary containing bomb properties
+            position: (x, y) release position of the bomb
+            acceleration: Constant vertical acceleration
+            depart_time: Release time in milliseconds
+            
+        Returns:
+            int: Slot of the bomb in the store
         """
-        # Add a current_position field to track position during flight
-        bomb["current_position"] = bomb["initial_position"]
-        self.bombs.append(bomb)
+        slot = self.bombs.add(position[0], position[1], depart_time, acceleration)
+        self.telemetry.emit(BOMB_DROP, depart_time, position[0], position[1])
+        self.bomb_expiries.schedule(depart_time + BOMB_LIFETIME, BOMB_EXPIRY,
+                                (slot, self.bombs.generation[slot]))
+        return slot
 
-    def remove_bombs(self, current_time):
+    def add_bombs(self, x, y, acceleration, depart_time):
         """
-        Remove bombs that have been in the air for more than 3 seconds
-        or have hit the ground.
+        Add a batch of bombs released at the same time, with a single
+        telemetry event and a single expiry event for the whole batch.
         
         Args:
-            current_time: Current time in milliseconds
+            x: Array of horizontal release positions
+            y: Array of vertical release positions
+            acceleration: Constant vertical acceleration
+            depart_time: Release time in milliseconds
+            
+        Returns:
+            numpy.ndarray: Slots of the bombs in the store
         """
-        self.bombs = [bomb for bomb in self.bombs if 
-                     bomb['initial_depart'] > current_time - 3000 and
-                     'hit_ground' not in bomb]
+        slots = self.bombs.add_many(x, y, depart_time, acceleration)
+        self.telemetry.emit(BOMBS_DROP, depart_time, len(slots))
+        self.bomb_expiries.schedule(depart_time + BOMB_LIFETIME, BOMBS_EXPIRY,
+                                (slots, self.bombs.generation[slots]))
+        return slots
 
-    def remove_bomb(self, bomb):
+    def schedule_bomb_expiries(self):
+        """
+        Replace the bomb expiry events with a sweep over the bomb store,
+        e.g. after it was restored. The sweep removes every bomb past its
+        lifetime and reschedules itself until the bombs it covers are gone.
         """
-        Remove a specific bomb from the list.
+        self.bomb_expiries.clear()
+        bombs = self.bombs
+        alive = bombs.alive[:bombs.size]
+        if alive.any():
+            depart = bombs.depart[:bombs.size][alive]
+            self.bomb_expiries.schedule(depart.min() + BOMB_LIFETIME, BOMB_SWEEP, depart.max())
+
+    def remove_bomb(self, slot):
+        """
+        Remove a specific bomb from the store.
         
         Args:
-            bomb: The bomb to remove
+            slot: Slot of the bomb to remove
         """
-        if bomb in self.bombs:
-            self.bombs.remove(bomb)
+        self.bombs.remove(slot)
 
-    def arm_automatic_fire(self, fire_time):
+    def arm_automatic_fire(self, fire_time, window):
         """
         Arms the automatic bomb-dropping mechanism.
+        Several target passes can be armed at once; arming a pass that
+        is already armed is ignored, whatever its new fire time.
         
         Args:
             fire_time: Time when the bomb should be dropped
+            window: (target, pass index) identifying the targeted pass
         """
-        if not self.autoBomb:
-            self.autoBomb = True
-            self.autoBomb_time = fire_time
+        if window not in self.armed_fires:
+            self.armed_fires[window] = fire_time
+            self.scheduler.schedule(fire_time, FIRE, window)
+            self.telemetry.emit(AUTO_FIRE_ARM, self.previous_time, fire_time)
             
     def add_explosion(self, position, time):
         """
-        Add an explosion at the specified position.
+        Add an explosion at the specified position and schedule its removal.
         
         Args:
             position: (x, y) coordinates of the explosion
             time: Current time in milliseconds
         """
-        explosion = {
-            'position': position,
-            'time_created': time
-        }
+        explosion = self.explosion_pool.acquire()
+        explosion.position = position
+        explosion.time_created = time
         self.explosions.append(explosion)
-        print(f"Explosion added at {position}")
-    
-    def remove_explosions(self, current_time):
+        self.scheduler.schedule(time + EXPLOSION_LIFETIME, EXPLOSION_EXPIRY, explosion)
+        self.telemetry.emit(EXPLOSION, time, position[0], position[1])
+
+    def process_events(self, current_time):
         """
-        Remove explosions that have been displayed for more than 500ms.
+        Handle the scheduled events that are due.
+        
+        Bombs that have been in the air for more than 3 seconds and
+        explosions displayed for more than 500ms are removed. Only due
+        events are touched, in O(k log n).
         
         Args:
             current_time: Current time in milliseconds
+            
+        Returns:
+            int: Number of armed automatic fires that are due
         """
-        old_count = len(self.explosions)
-        self.explosions = [exp for exp in self.explosions if exp['time_created'] > current_time - 500]
-        
\ No newline at end of file
+        for _, kind, payload in self.bomb_expiries.pop_due(current_time):
+            if kind == BOMB_EXPIRY:
+                slot, generation = payload
+                # The slot may have been reused since the bomb hit the ground
+                if self.bombs.generation[slot] == generation:
+                    self.bombs.remove(slot)
+            elif kind == BOMBS_EXPIRY:
+                slots, generations = payload
+                self.bombs.release(slots[self.bombs.generation[slots] == generations])
+            elif kind == BOMB_SWEEP:
+                # payload: latest release time covered by the sweep
+                bombs = self.bombs
+                alive = bombs.alive[:bombs.size]
+                depart = bombs.depart[:bombs.size]
+                bombs.release(np.flatnonzero(alive & (depart <= current_time - BOMB_LIFETIME)))
+                alive = bombs.alive[:bombs.size]
+                depart = bombs.depart[:bombs.size]
+                pending = depart[alive & (depart <= payload)]
+                if len(pending):
+                    self.bomb_expiries.schedule(pending.min() + BOMB_LIFETIME, BOMB_SWEEP, payload)
+
+        fires = 0
+        for _, kind, payload in self.scheduler.pop_due(current_time):
+            if kind == FIRE:
+                fire_time = self.armed_fires.pop(payload)
+                self.telemetry.emit(AUTO_FIRE, current_time, fire_time)
+                fires += 1
+            elif kind == EXPLOSION_EXPIRY:
+                # Explosions expire in creation order, so this is the oldest one
+                if self.explosions and self.explosions[0] is payload:
+                    self.explosions.popleft()
+                else:
+                    self.explosions.remove(payload)
+                self.explosion_pool.release(payload)
+        return fires
@@ -0,0 +1,188 @@
+"""
+Buffered structured telemetry.
+
+Game code emits small fixed-shape events (time, event, level and two
+numbers) into a preallocated ring buffer, which costs a few attribute
+stores. A background thread periodically flushes the buffer as JSON
+lines or as compact fixed-size binary records, so slow consoles or disks
+never stall a frame.
+"""
+import json
+import struct
+import sys
+import threading
+import time
+from array import array
+
+# Levels
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning"}
+
+# Events and the names of their two values
+EXPLOSION = 0
+BOMB_DROP = 1
+AUTO_FIRE_ARM = 2
+AUTO_FIRE = 3
+FRAME_OVERRUN = 4
+BOMBS_DROP = 5  # A batch of bombs released at once, e.g. by a fleet
+EVENTS = {
+    EXPLOSION: ("explosion", ("x", "y")),
+    BOMB_DROP: ("bomb_drop", ("x", "y")),
+    AUTO_FIRE_ARM: ("auto_fire_arm", ("fire_time", None)),
+    AUTO_FIRE: ("auto_fire", ("fire_time", None)),
+    FRAME_OVERRUN: ("frame_overrun", ("frame_ms", "budget_ms")),
+    BOMBS_DROP: ("bombs_drop", ("count", None)),
+}
+
+RECORD = struct.Struct("<dBBdd")  # time, event, level, a, b
+
+
+class TelemetryBus:
+    """Ring-buffered event recorder with a background flushing thread."""
+
+    def __init__(self, output=None, format="jsonl", capacity=4096, level=INFO,
+                 rate_limits=None, interval=0.5):
+        """
+        Initialize the bus. Nothing is written until start() is called.
+
+        Args:
+            output: Path of the output file, "-" for stdout, or None to
+                only keep the most recent events in memory
+            format: "jsonl" for JSON lines or "binary" for fixed-size records
+            capacity: Number of events the ring buffer holds
+            level: Minimum level of the recorded events
+            rate_limits: Dictionary mapping events to a maximum number of
+                recorded events per second
+            interval: Seconds between two flushes
+        """
+        if format not in ("jsonl", "binary"):
+            raise ValueError(f"unknown telemetry format {format!r}")
+        self.output = output
+        self.format = format
+        self.capacity = capacity
+        self.level = level
+        self.rate_limits = dict(rate_limits or {})
+        self.interval = interval
+
+        # Ring buffer
+        self.times = array("d", bytes(8 * capacity))
+        self.events = bytearray(capacity)
+        self.levels = bytearray(capacity)
+        self.values_a = array("d", bytes(8 * capacity))
+        self.values_b = array("d", bytes(8 * capacity))
+        self.written = 0  # Events ever written to the ring buffer
+        self.flushed = 0  # Events handed to the output
+        self.dropped = 0  # Events overwritten before being flushed
+        self.suppressed = 0  # Events refused by the rate limits
+
+        self._window = int(time.monotonic())
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+
+    def emit(self, event, current_time, a=0.0, b=0.0, level=INFO):
+        """
+        Record an event.
+
+        Args:
+            event: Event type, e.g. EXPLOSION
+            current_time: Game time in milliseconds
+            a: First value of the event
+            b: Second value of the event
+            level: Level of the event
+        """
+        if level < self.level:
+            return
+        limit = self.rate_limits.get(event)
+        if limit is not None:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._counts.clear()
+            count = self._counts.get(event, 0)
+            if count >= limit:
+                self.suppressed += 1
+                return
+            self._counts[event] = count + 1
+
+        with self._lock:
+            i = self.written % self.capacity
+            self.times[i] = current_time
+            self.events[i] = event
+            self.levels[i] = level
+            self.values_a[i] = a
+            self.values_b[i] = b
+            self.written += 1
+
+    def recent(self):
+        """
+        Return the events still held in the ring buffer, oldest first.
+
+        Returns:
+            list: (time, event, level, a, b) tuples
+        """
+        with self._lock:
+            start = max(0, self.written - self.capacity)
+            return [self._record(n % self.capacity) for n in range(start, self.written)]
+
+    def _record(self, i):
+        return (self.times[i], self.events[i], self.levels[i],
+                self.values_a[i], self.values_b[i])
+
+    def _encode(self, record):
+        """Format a record for the output."""
+        if self.format == "binary":
+            return RECORD.pack(*record)
+        current_time, event, level, a, b = record
+        name, (name_a, name_b) = EVENTS.get(event, (str(event), ("a", "b")))
+        entry = {"t": current_time, "event": name, "level": LEVEL_NAMES.get(level, level)}
+        if name_a:
+            entry[name_a] = a
+        if name_b:
+            entry[name_b] = b
+        return json.dumps(entry) + "\n"
+
+    def flush(self):
+        """Write the events recorded since the last flush to the output."""
+        with self._lock:
+            start = max(self.flushed, self.written - self.capacity)
+            self.dropped += start - self.flushed
+            records = [self._record(n % self.capacity) for n in range(start, self.written)]
+            self.flushed = self.written
+
+        if self._file is not None and records:
+            self._file.write((b"" if self.format == "binary" else "").join(
+                self._encode(record) for record in records))
+            self._file.flush()
+
+    def start(self):
+        """Open the output and start the background flushing thread."""
+        if self.output is None or self._thread is not None:
+            return self
+        if self.output == "-":
+            self._file = sys.stdout.buffer if self.format == "binary" else sys.stdout
+        else:
+            self._file = open(self.output, "wb" if self.format == "binary" else "w")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        """Stop the thread, flush the remaining events and close the output."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._file is not None and self.output != "-":
+            self._file.close()
+        self._file = None
@@ -0,0 +1,103 @@
+import math
+import numpy as np
+import pygame
+from constants import *
+
+
+class TerrainLayer:
+    """
+    Cached rendering of the periodic, undulating ground.
+
+    The ground repeats every background_period pixels, so it is rendered
+    once into a strip one period plus one screen wide. Each frame draws
+    the screen-wide window of that strip at the current scroll offset
+    with a single blit. The cache is rebuilt when the dimensions or the
+    ground height change.
+    """
+
+    def __init__(self, color=GREEN):
+        """
+        Initialize an empty layer; it is built on first use.
+
+        Args:
+            color: RGB color of the ground
+        """
+        self.color = color
+        self.surface = None
+        self.heightmap = None
+        self.background_period = 0
+        self._key = None
+
+    def invalidate(self):
+        """Force the strip to be rebuilt on the next draw."""
+        self._key = None
+
+    def build(self, dimensions, ground_height):
+        """
+        Rebuild the heightmap and strip if the parameters changed.
+
+        Args:
+            dimensions: (width, height) of the screen
+            ground_height: Maximum height of the ground in pixels
+        """
+        key = (tuple(dimensions), ground_height)
+        if key == self._key:
+            return
+        self._key = key
+
+        width = dimensions[0]
+        self.background_period = width + 200  # Match the original
+
+        # Ground height for every column of one period
+        u = np.arange(self.background_period)
+        alpha = u * 2.0 * math.pi / self.background_period
+        self.heightmap = ground_height * np.exp(np.cos(alpha)) / math.e
+
+        strip_height = max(1, int(math.ceil(ground_height)))
+        self.surface = pygame.Surface((self.background_period + width, strip_height),
+                                      pygame.SRCALPHA)
+        for x in range(self.background_period + width):
+            y = self.heightmap[x % self.background_period]
+            pygame.draw.rect(self.surface, self.color,
+                             ((x, strip_height - y), (1, y)))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+    def scroll_offset(self, current_time):
+        """
+        Return the strip column shown at the left edge of the screen.
+
+        Args:
+            current_time: Current time in milliseconds
+        """
+        return int(current_time * HORIZONTAL_SPEED) % self.background_period
+
+    def height_at(self, x, current_time):
+        """
+        Return the ground height under screen column(s) x.
+
+        Args:
+            x: Screen column, or array of columns
+            current_time: Current time in milliseconds
+        """
+        offset = self.scroll_offset(current_time)
+        return self.heightmap[(np.asarray(x, dtype=int) + offset) % self.background_period]
+
+    def draw(self, screen, dimensions, ground_height, current_time):
+        """
+        Draw the ground at the current scroll offset.
+
+        Args:
+            screen: Surface to draw on
+            dimensions: (width, height) of the screen
+            ground_height: Maximum height of the ground in pixels
+            current_time: Current time in milliseconds
+
+        Returns:
+            pygame.Rect: Area of the screen that was drawn
+        """
+        self.build(dimensions, ground_height)
+        strip_height = self.surface.get_height()
+        offset = self.scroll_offset(current_time)
+        return screen.blit(self.surface, (0, dimensions[1] - strip_height),
+                           (offset, 0, dimensions[0], strip_height))
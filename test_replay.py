@@ -0,0 +1,47 @@
+import random
+from clock import VirtualClock
+from replay import Recorder, read, replay, BOMB, AUTO_FIRE
+from simulation import Simulation
+
+
+def play(path, frames=600, seed=3):
+    """Play a session the way the Controller does, with irregular frame times."""
+    rng = random.Random(seed)
+    simulation = Simulation(clock=VirtualClock(1234.5), dt=1000.0 / 240)
+    recorder = Recorder(path, dt=simulation.dt)
+    recorder.start(simulation.clock.get_ticks())
+    accumulator = 0.0
+    for _ in range(frames):
+        now = simulation.clock.get_ticks()
+        if rng.random() < 0.3:
+            altitude = rng.randrange(50, 450)
+            recorder.motion(now, altitude)
+            simulation.move_plane(altitude)
+        if rng.random() < 0.05:
+            recorder.record(now, BOMB)
+            simulation.add_bomb()
+        if rng.random() < 0.01:
+            recorder.record(now, AUTO_FIRE)
+            simulation.try_automatic_fire()
+        accumulator += rng.uniform(5.0, 40.0)
+        while accumulator >= simulation.dt:
+            simulation.step()
+            accumulator -= simulation.dt
+    recorder.close(simulation.clock.get_ticks())
+    return simulation
+
+
+def test_replay_regenerates_fixed_steps(tmp_path):
+    path = tmp_path / "session.b52"
+    original = play(path)
+    dt, records = read(path)
+    # Only inputs are logged, not one record per step
+    assert len(records) < 300
+
+    replayed = replay(records, dt)
+    assert replayed.clock.get_ticks() == original.clock.get_ticks()
+    assert replayed.state.plane_altitude == original.state.plane_altitude
+    assert replayed.state.bombs.positions()[1].tolist() == \
+        original.state.bombs.positions()[1].tolist()
+    assert replayed.targets.hits.tolist() == original.targets.hits.tolist()
+    assert len(replayed.state.explosions) == len(original.state.explosions)
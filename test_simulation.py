@@ -0,0 +1,65 @@
+import numpy as np
+from clock import VirtualClock
+from simulation import Simulation
+from telemetry import BOMBS_DROP
+
+
+def fly_until_landed(simulation, ticks=240 * 20):
+    """Step until every armed shot has been fired and every bomb is gone."""
+    for _ in range(ticks):
+        simulation.step()
+        if not simulation.state.autoBomb and len(simulation.state.bombs) == 0:
+            return
+
+
+def test_automatic_fire_arms_first_window_of_schedule():
+    for start in (0.0, 3000.0, 9000.0):
+        simulation = Simulation(clock=VirtualClock(start), dt=1000.0 / 240)
+        schedule = simulation.plan_automatic_fire(windows=1)
+        simulation.try_automatic_fire()
+        assert simulation.state.autoBomb_time == schedule["fire_time"][0]
+
+        fly_until_landed(simulation)
+        assert simulation.targets.hits.tolist() == [1]
+
+
+def test_automatic_fire_considers_every_target():
+    simulation = Simulation(clock=VirtualClock(3000.0), dt=1000.0 / 240)
+    flag_time = simulation.plan_automatic_fire(windows=1)["fire_time"][0]
+    target = simulation.targets.add(600, 20, simulation.dimensions[1] - 50,
+                                    simulation.dimensions[1] - 10)
+
+    schedule = simulation.plan_automatic_fire(windows=1)
+    assert len(schedule) == 2
+    assert schedule["fire_time"][0] < flag_time
+    assert schedule["target"][0] == target
+
+    simulation.try_automatic_fire()
+    fly_until_landed(simulation)
+    assert simulation.targets.hits.tolist() == [0, 1]
+
+
+def test_repeated_automatic_fire_arms_one_shot_per_pass():
+    """K_a pressed again while climbing must not arm the same pass twice."""
+    simulation = Simulation(dt=1000.0 / 240)
+    for press in range(5):
+        simulation.try_automatic_fire()
+        simulation.move_plane(250 - 50 * press)
+        for _ in range(24):
+            simulation.step()
+    assert len(simulation.state.armed_fires) == 1
+
+    restored = Simulation(dt=1000.0 / 240)
+    restored.restore(simulation.snapshot())
+    assert restored.state.armed_fires == simulation.state.armed_fires
+    restored.try_automatic_fire()
+    assert len(restored.state.armed_fires) == 1
+
+
+def test_fleet_bomb_drop_emits_one_batched_event():
+    simulation = Simulation(dt=1000.0 / 240)
+    fleet = simulation.add_fleet(50)
+    fleet.drop_bombs()
+    drops = [record for record in simulation.state.telemetry.recent()
+             if record[1] == BOMBS_DROP]
+    assert [record[3] for record in drops] == [50]
@@ -0,0 +1,66 @@
+import numpy as np
+from simulation import Simulation
+
+
+def trace(simulation, ticks):
+    """Step a simulation and return what each step left in its state."""
+    states = []
+    for _ in range(ticks):
+        simulation.step()
+        state = simulation.state
+        x, y = state.bombs.positions()
+        states.append((state.plane_altitude, sorted(zip(x.tolist(), y.tolist())),
+                       len(state.explosions), len(state.scheduler)))
+    return states
+
+
+def test_restore_steps_past_pending_expiries():
+    """Bombs have landed, so size is 0, but their expiry events are still queued."""
+    original = Simulation(dt=1000.0 / 240)
+    for _ in range(5):
+        original.add_bomb()
+    original.run(400)
+    assert len(original.state.bombs) == 0 and len(original.state.bomb_expiries) > 0
+
+    data = original.snapshot()
+    expected = trace(original, 800)
+    for copy in (True, False):
+        restored = Simulation(dt=1000.0 / 240)
+        restored.restore(bytearray(data), copy=copy)
+        assert trace(restored, 800) == expected
+
+
+def test_restore_keeps_generations_of_reused_slots():
+    """Stale expiry events must not remove the bombs reusing their slots."""
+    simulation = Simulation(dt=1000.0 / 240)
+    for _ in range(10):
+        simulation.add_bomb()
+    simulation.run(400)
+
+    restored = Simulation(dt=1000.0 / 240)
+    restored.restore(simulation.snapshot())
+    restored.state.add_bombs(np.arange(300.0), np.full(300, -1e6), restored.gravity,
+                             restored.clock.get_ticks())
+    restored.run(480)
+    assert len(restored.state.bombs) == 300
+
+
+def test_restore_rebuilds_bomb_expiries():
+    """Bombs in flight expire at the same time after a restore."""
+    original = Simulation(dt=1000.0 / 240)
+    for i in range(600):
+        original.move_plane(100 + i % 300)
+        if i % 3 == 0:
+            original.add_bomb()
+        original.step()
+    original.move_plane(-1e6)  # Keep new bombs in the air until they expire
+    original.state.plane_altitude = -1e6
+    for _ in range(200):
+        original.add_bomb()
+        original.step()
+
+    data = original.snapshot()
+    expected = trace(original, 900)
+    restored = Simulation(dt=1000.0 / 240)
+    restored.restore(data)
+    assert trace(restored, 900) == expected
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+import pygame
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces."""
+
+    def __init__(self, font, max_size=256):
+        """
+        Initialize an empty cache.
+
+        Args:
+            font: pygame Font used for rendering
+            max_size: Maximum number of surfaces kept
+        """
+        self.font = font
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def clear(self):
+        """Drop every cached surface."""
+        self.surfaces.clear()
+
+    def render(self, text, color, antialias=True):
+        """
+        Return the rendered surface for a string, rendering it on a miss.
+
+        Args:
+            text: String to render
+            color: RGB color tuple
+            antialias: Whether to antialias the glyphs
+
+        Returns:
+            pygame.Surface: Rendered text
+        """
+        key = (text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = self.font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs for dynamic numeric readouts.
+
+    Values that change every frame would thrash a TextCache, so each
+    character is rendered once and strings are assembled with one
+    Surface.blits call.
+    """
+
+    def __init__(self, font, color, characters="0123456789+-.:% abcdefghijklmnopqrstuvwxyz",
+                 antialias=True):
+        """
+        Render every character of the atlas.
+
+        Args:
+            font: pygame Font used for rendering
+            color: RGB color tuple
+            characters: Characters available in readouts; lowercase letters
+                are included for units and short labels
+            antialias: Whether to antialias the glyphs
+        """
+        self.glyphs = {char: font.render(char, antialias, color) for char in characters}
+        self.height = font.get_height()
+
+    def draw(self, screen, x, y, text):
+        """
+        Draw a string made of atlas characters.
+
+        Characters missing from the atlas are skipped.
+
+        Args:
+            screen: Surface to draw on
+            x: Horizontal position
+            y: Vertical position
+            text: String to draw
+
+        Returns:
+            pygame.Rect: Area of the screen that was drawn
+        """
+        batch = []
+        cursor = x
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is not None:
+                batch.append((glyph, (cursor, y)))
+                cursor += glyph.get_width()
+        screen.blits(batch, doreturn=False)
+        return pygame.Rect(x, y, cursor - x, self.height)
@@ -1,37 +1,82 @@
+from itertools import repeat
 import pygame
-import math
+import numpy as np
+from assets import AssetManager
+from terrain import TerrainLayer
+from text_cache import TextCache, GlyphAtlas
+from instruments import Gauge, InstrumentPanel
 from constants import *
 
 class View:
-    def __init__(self, dimensions):
-        """Initialize the view with given window dimensions."""
-        pygame.init()
+    def __init__(self, dimensions, dirty_rects=False, fps=FPS, asset_cache=None):
+        """
+        Initialize the view with given window dimensions.
+        
+        Args:
+            dimensions: (width, height) of the window
+            dirty_rects: Only push the areas touched since the last frame
+                to the display instead of flipping the whole surface
+            fps: Frame rate cap, 0 for no cap
+            asset_cache: Directory of the raw-pixel image cache, or None
+        """
+        # Only the modules the view uses; pygame.init() would also start audio
+        pygame.display.init()
+        pygame.font.init()
         pygame.display.set_caption("B2 - Bomber")
         
         self.screen = pygame.display.set_mode(dimensions)
         self.clock = pygame.time.Clock()
+        self.fps = fps
         self.font = pygame.font.SysFont("monospace", 16)
         self.dimensions = dimensions
         self.text_size = 16
+        self.text_cache = TextCache(self.font)
+        self.glyph_atlases = {}
 
-        # Load images
+        # Load images, all sharing one atlas
+        self.assets = AssetManager(cache_dir=asset_cache)
         try:
-            self.plane_image = pygame.image.load("plane.png").convert_alpha()
-            self.cloud_image = pygame.image.load("cloud.png").convert_alpha()
-            self.bomb_image = pygame.image.load("bomb.png").convert_alpha()
-            self.explosion_image = pygame.image.load("explosion.png").convert_alpha()
-        except pygame.error as e:
+            images = self.assets.load_atlas(["plane.png", "cloud.png", "bomb.png", "explosion.png"])
+        except (pygame.error, OSError) as e:
             print(f"Error loading images: {e}")
             exit()
+        self.plane_image = images["plane.png"]
+        self.cloud_image = images["cloud.png"]
+        self.bomb_image = images["bomb.png"]
+        self.explosion_image = images["explosion.png"]
 
         # View properties
-        self.ground_height = 20
-        self.variometer_value = 0.0
-        self.accelerometer_value = 0.0
+        self.ground_height = GROUND_HEIGHT
+        self.terrain = TerrainLayer()
+
+        # Dirty-rectangle rendering
+        self.dirty_rects = dirty_rects
+        self.dirty = []  # Rects touched in the current frame
+        self.previous_dirty = None  # Rects touched in the last frame
+        self.instruments = InstrumentPanel(self.text_cache, self.text_size)
+
+    def mark_dirty(self, rect):
+        """
+        Record a screen area touched by a draw call.
+        
+        Args:
+            rect: Area that was drawn
+            
+        Returns:
+            pygame.Rect: The same area
+        """
+        if self.dirty_rects:
+            self.dirty.append(rect)
+        return rect
 
     def draw(self):
         """Fill the screen with the background color."""
-        self.screen.fill(LIGHTBLUE)
+        if self.dirty_rects and self.previous_dirty is not None:
+            # Only erase what was drawn during the last frame
+            for rect in self.previous_dirty:
+                self.screen.fill(LIGHTBLUE, rect)
+        else:
+            self.screen.fill(LIGHTBLUE)
 
     def draw_plane(self, altitude):
         """
@@ -42,7 +87,7 @@ class View:
         """
         x = (self.dimensions[0] - self.plane_image.get_width()) // 2
         y = int(altitude) - self.plane_image.get_height() // 2
-        self.screen.blit(self.plane_image, (x, y))
+        return self.mark_dirty(self.screen.blit(self.plane_image, (x, y)))
 
     def draw_bombs(self, position):
         """
@@ -52,7 +97,58 @@ class View:
             position: (x, y) coordinates for the bomb
         """
         #pygame.draw.circle(self.screen, ORANGE, list(map(int, position)), 10)
-        self.screen.blit(self.bomb_image, (position[0], position[1]))
+        return self.mark_dirty(self.screen.blit(self.bomb_image, (position[0], position[1])))
+
+    def draw_bomb_batch(self, x, y):
+        """
+        Draw many bombs at once.
+        
+        Args:
+            x: Array of horizontal positions of the bombs
+            y: Array of vertical positions of the bombs
+        """
+        return self.draw_sprites(self.bomb_image, x, y)
+
+    def draw_explosions(self, positions):
+        """
+        Draw many explosions at once, centered as draw_explosion() does.
+        
+        Args:
+            positions: Sequence of (x, y) coordinates of the explosions
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        width, height = self.explosion_image.get_size()
+        x = np.trunc(positions[:, 0] - width // 2)
+        y = np.trunc(positions[:, 1] - height) + 20
+        return self.draw_sprites(self.explosion_image, x, y)
+
+    def draw_sprites(self, image, x, y):
+        """
+        Draw copies of an image with a single Surface.blits call.
+        
+        Copies lying entirely outside the screen are culled first, and
+        positions are truncated to whole pixels like Surface.blit does.
+        
+        Args:
+            image: Surface to draw
+            x: Array of horizontal positions of the top-left corners
+            y: Array of vertical positions of the top-left corners
+            
+        Returns:
+            list: Areas drawn when dirty rects are enabled, else an empty list
+        """
+        x = np.asarray(x).astype(int)
+        y = np.asarray(y).astype(int)
+        width, height = image.get_size()
+        visible = (x > -width) & (x < self.dimensions[0]) & (y > -height) & (y < self.dimensions[1])
+        if not visible.any():
+            return []
+        positions = zip(x[visible].tolist(), y[visible].tolist())
+        rects = self.screen.blits(zip(repeat(image), positions), doreturn=self.dirty_rects)
+        if not self.dirty_rects:
+            return []
+        self.dirty.extend(rects)
+        return rects
 
     def draw_explosion(self, position):
         """
@@ -74,27 +170,20 @@ class View:
         cloud_width = self.cloud_image.get_width()
         background_period = self.dimensions[0] + cloud_width
         
-        for cloud in clouds:
-            x = (int(cloud[0] - current_time * HORIZONTAL_SPEED) 
-                 % background_period - cloud_width)
-            y = cloud[1]
-            self.screen.blit(self.cloud_image, (x, y))
+        clouds = np.asarray(clouds, dtype=float).reshape(-1, 2)
+        x = (np.trunc(clouds[:, 0] - current_time * HORIZONTAL_SPEED).astype(int)
+             % background_period - cloud_width)
+        self.draw_sprites(self.cloud_image, x, clouds[:, 1])
 
     def draw_ground(self, current_time):
         """
-        Draw the undulating ground.
+        Draw the undulating ground from the cached terrain layer.
         
         Args:
             current_time: Current time in milliseconds
         """
-        background_period = self.dimensions[0] + 200  # Match the original
-        
-        for x in range(self.dimensions[0]):
-            alpha = ((-x - current_time * HORIZONTAL_SPEED) 
-                    * 2.0 * math.pi / background_period)
-            y = self.ground_height * math.exp(math.cos(alpha)) / math.e
-            pygame.draw.rect(self.screen, GREEN, 
-                            ((x, self.dimensions[1] - y), (1, y)))
+        return self.mark_dirty(
+            self.terrain.draw(self.screen, self.dimensions, self.ground_height, current_time))
 
     def draw_flag(self, current_time):
         """
@@ -107,15 +196,47 @@ class View:
         x = int(-current_time * HORIZONTAL_SPEED) % background_period
     
         # Draw flag pole
-        pygame.draw.rect(self.screen, BLACK, 
-                        ((x, self.dimensions[1] - 50), (3, 40)))
+        pole = pygame.draw.rect(self.screen, BLACK, 
+                               ((x, self.dimensions[1] - 50), (3, 40)))
 
         # Draw flag triangle
-        pygame.draw.polygon(self.screen, RED, [
+        cloth = pygame.draw.polygon(self.screen, RED, [
             (x, self.dimensions[1] - 45),
             (x, self.dimensions[1] - 25),
             (x + 20, self.dimensions[1] - 35)
         ])
+        return self.mark_dirty(pole.union(cloth))
+
+    def draw_reticle(self, impact_x, miss, target_width=20):
+        """
+        Mark the predicted impact points of bombs on the ground.
+        
+        The markers are written straight into the pixel array, so the cost
+        does not depend on how many candidates there are.
+        
+        Args:
+            impact_x: Horizontal screen positions of the impacts
+            miss: Signed distance of each impact from the flag's left edge
+            target_width: Width of the flag in pixels
+        """
+        impact_x = np.asarray(impact_x).astype(int)
+        visible = (impact_x >= 0) & (impact_x < self.dimensions[0])
+        if not visible.any():
+            return None
+        hit = (miss >= 0) & (miss <= target_width)
+
+        top = self.dimensions[1] - self.ground_height - 10
+        rows = np.arange(top, top + 6)
+        pixels = pygame.surfarray.pixels2d(self.screen)
+        try:
+            columns = impact_x[visible & ~hit]
+            pixels[columns[:, None], rows] = self.screen.map_rgb(BLACK)
+            columns = impact_x[visible & hit]
+            pixels[columns[:, None], rows] = self.screen.map_rgb(RED)
+        finally:
+            del pixels
+        xs = impact_x[visible]
+        return self.mark_dirty(pygame.Rect(xs.min(), top, xs.max() - xs.min() + 1, len(rows)))
 
     def display_text(self, x, y, text, color):
         """
@@ -127,45 +248,76 @@ class View:
             text: Text to display
             color: RGB color tuple
         """
-        text_image = self.font.render(text, True, color)
-        self.screen.blit(text_image, (x, y))
+        text_image = self.text_cache.render(text, color)
+        return self.mark_dirty(self.screen.blit(text_image, (x, y)))
 
-    def draw_variometer(self, x, y, velocity):
+    def display_readout(self, x, y, text, color):
         """
-        Draw the vertical velocity indicator.
+        Display text that changes every frame from the glyph atlas,
+        leaving the text cache to constant labels.
         
         Args:
             x: Horizontal position
             y: Vertical position
-            velocity: Current vertical velocity
+            text: Digits, signs and lowercase letters to display
+            color: RGB color tuple
         """
-        # Smooth the value for display
-        self.variometer_value = 0.8 * self.variometer_value + 0.2 * velocity
-        
-        height = 100
-        width = 40
-        thickness = 2
-        
-        # Calculate indicator position
-        indicator = int((self.variometer_value + 1.0) * height / 2.0)
+        atlas = self.glyph_atlases.get(color)
+        if atlas is None:
+            atlas = self.glyph_atlases[color] = GlyphAtlas(self.font, color)
+        return self.mark_dirty(atlas.draw(self.screen, x, y, text))
+
+    def display_number(self, x, y, value, color, fmt="{:.2f}"):
+        """
+        Display a changing numeric value from the glyph atlas.
         
-        # Clamp indicator position
-        if indicator < thickness:
-            indicator = thickness
-        elif indicator >= height - thickness:
-            indicator = height - thickness
+        Args:
+            x: Horizontal position
+            y: Vertical position
+            value: Number to display
+            color: RGB color tuple
+            fmt: Format string applied to the value
+        """
+        return self.display_readout(x, y, fmt.format(value), color)
+
+    def add_gauge(self, name, label, x, y, color, gain=1.0):
+        """
+        Add a gauge to the instrument panel.
         
-        # Draw labels
-        self.display_text(x + 10, y - 20, "Vy", BLACK)
-        self.display_text(x - 20, y + (height - self.text_size) // 2, "0-", BLACK)
+        Args:
+            name: Key used to pass the gauge its value
+            label: Text displayed above the gauge
+            x: Horizontal position
+            y: Vertical position
+            color: RGB color of the indicator bar
+            gain: Factor applied to the value before display
+        """
+        return self.instruments.add(Gauge(name, label, x, y, color, gain))
+
+    def draw_instruments(self, values, names=None):
+        """
+        Draw the instrument panel.
         
-        # Draw variometer background
-        pygame.draw.rect(self.screen, BLACK, ((x, y), (width, height)))
+        Args:
+            values: Dictionary mapping gauge names to their current values
+            names: Gauges to draw; all of them when None
+        """
+        for rect in self.instruments.draw(self.screen, values, names):
+            self.mark_dirty(rect)
+
+    def draw_variometer(self, x, y, velocity):
+        """
+        Draw the vertical velocity indicator.
         
-        # Draw indicator bar
-        pygame.draw.rect(self.screen, GREEN, 
-                        ((x, y + height - indicator - thickness), 
-                         (width, 2 * thickness)))
+        Args:
+            x: Horizontal position
+            y: Vertical position
+            velocity: Current vertical velocity
+        """
+        gauge = self.instruments.gauges.get("variometer")
+        if gauge is None or (gauge.x, gauge.y) != (x, y):
+            self.add_gauge("variometer", "Vy", x, y, GREEN)
+        self.draw_instruments({"variometer": velocity}, ["variometer"])
 
     def draw_accelerometer(self, x, y, acceleration):
         """
@@ -176,39 +328,22 @@ class View:
             y: Vertical position
             acceleration: Current vertical acceleration
         """
-        # Apply gain and smoothing for display
-        GAIN = 200
-        self.accelerometer_value = 0.8 * self.accelerometer_value + 0.2 * acceleration * GAIN
-        
-        height = 100
-        width = 40
-        thickness = 2
-        
-        # Calculate indicator position
-        indicator = int((self.accelerometer_value + 1.0) * height / 2.0)
-        
-        # Clamp indicator position
-        if indicator < thickness:
-            indicator = thickness
-        elif indicator >= height - thickness:
-            indicator = height - thickness
-        
-        # Draw labels
-        self.display_text(x + 10, y - 20, "Ay", BLACK)
-        self.display_text(x - 20, y + (height - self.text_size) // 2, "0-", BLACK)
-        
-        # Draw accelerometer background
-        pygame.draw.rect(self.screen, BLACK, ((x, y), (width, height)))
-        
-        # Draw indicator bar
-        pygame.draw.rect(self.screen, RED, 
-                        ((x, y + height - indicator - thickness), 
-                         (width, 2 * thickness)))
+        gauge = self.instruments.gauges.get("accelerometer")
+        if gauge is None or (gauge.x, gauge.y) != (x, y):
+            self.add_gauge("accelerometer", "Ay", x, y, RED, gain=200)
+        self.draw_instruments({"accelerometer": acceleration}, ["accelerometer"])
 
     def update_display(self):
         """Update the screen and control frame rate."""
-        pygame.display.flip()
-        self.clock.tick(FPS)
+        if self.dirty_rects and self.previous_dirty is not None:
+            # Push the areas erased from the last frame and drawn in this one
+            pygame.display.update(self.previous_dirty + self.dirty)
+        else:
+            pygame.display.flip()
+        if self.dirty_rects:
+            self.previous_dirty = self.dirty
+            self.dirty = []
+        self.clock.tick(self.fps)
         
     def draw_explosion(self, position):
         """
@@ -220,4 +355,4 @@ class View:
         # Center the explosion image at the given position
         x = int(position[0] - self.explosion_image.get_width() // 2)
         y = int(position[1] - self.explosion_image.get_height()) + 20
-        self.screen.blit(self.explosion_image, (x, y))
\ No newline at end of file
+        return self.mark_dirty(self.screen.blit(self.explosion_image, (x, y)))
\ No newline at end of file